@@ -1,7 +1,12 @@
 from flask import Flask
 from config import Config
+from app.archive import archive_revisions_command
+from app.cache import configure_shared_backend
 from app.extensions import db, migrate
+from app.pool import InstrumentedQueuePool, prefill_pool
 from app.public.api import public_bp
+from app.public.auth import verified_tokens
+from app.public.launchpad import get_user_teams
 from app.publisher.api import publisher_bp
 from app.dashboard.routes import dashboard_bp
 from app.sso import init_sso
@@ -11,8 +16,21 @@ def create_app():
     app = Flask(__name__, template_folder="templates")
     app.config.from_object(Config)
 
+    for engine_options in (
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"],
+        *app.config["SQLALCHEMY_BINDS"].values(),
+    ):
+        if "pool_size" in engine_options:
+            engine_options.setdefault("poolclass", InstrumentedQueuePool)
+
     db.init_app(app)
     migrate.init_app(app, db)
+    configure_shared_backend(app.config["CACHE_URL"])
+    get_user_teams.cache.maxsize = app.config["LAUNCHPAD_TEAMS_CACHE_SIZE"]
+    verified_tokens.maxsize = app.config["JWT_CACHE_SIZE"]
+
+    with app.app_context():
+        prefill_pool(db.engine, app.config["DB_POOL_PREFILL"])
 
     @app.context_processor
     def inject_config():
@@ -26,6 +44,7 @@ def create_app():
         app.register_blueprint(publisher_bp, url_prefix="/api/publisher")
 
     init_sso(app)
+    app.cli.add_command(archive_revisions_command)
 
     return app
 
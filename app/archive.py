@@ -0,0 +1,195 @@
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, exists, insert, select
+
+from app.child_sets import SET_COLUMNS
+from app.extensions import db
+from app.models import (
+    Charm,
+    ChildSet,
+    ReviewAction,
+    Solution,
+    SolutionArchive,
+    SolutionStatus,
+    UseCase,
+    UsefulLink,
+    child_set_maintainer,
+)
+from app.utils import SOLUTION_LOAD_OPTIONS, serialize_solution
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+DEFAULT_ARCHIVE_BATCH_SIZE = 200
+
+
+def _serialize_review_action(action: ReviewAction) -> dict:
+    return {
+        "reviewer_id": action.reviewer_id,
+        "action": action.action.value,
+        "comment": action.comment,
+        "timestamp": action.timestamp.isoformat(),
+    }
+
+
+def archive_unpublished_revisions(
+    older_than: timedelta, batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE
+) -> int:
+    """
+    Move the UNPUBLISHED revisions last updated before `older_than` ago,
+    with their review actions, from the live tables to the solution
+    archive. Each batch is moved in its own transaction, and the child sets
+    no longer referenced by any revision are pruned afterwards. Returns the
+    number of archived revisions.
+    """
+    cutoff = datetime.now() - older_than
+    archived = 0
+
+    while True:
+        solutions = (
+            db.session.query(Solution)
+            .options(*SOLUTION_LOAD_OPTIONS)
+            .filter(
+                Solution.status == SolutionStatus.UNPUBLISHED,
+                Solution.last_updated < cutoff,
+            )
+            .order_by(Solution.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not solutions:
+            prune_child_sets()
+            return archived
+
+        ids = [solution.id for solution in solutions]
+        actions = {}
+        for action in db.session.query(ReviewAction).filter(
+            ReviewAction.solution_id.in_(ids)
+        ):
+            actions.setdefault(action.solution_id, []).append(
+                _serialize_review_action(action)
+            )
+
+        db.session.execute(
+            insert(SolutionArchive),
+            [
+                {
+                    "id": solution.id,
+                    "hash": solution.hash,
+                    "name": solution.name,
+                    "revision": solution.revision,
+                    "publisher_id": solution.publisher_id,
+                    "archived_at": datetime.now(),
+                    "data": {
+                        **serialize_solution(solution),
+                        "review_actions": actions.get(solution.id, []),
+                    },
+                }
+                for solution in solutions
+            ],
+        )
+
+        db.session.execute(
+            delete(ReviewAction).where(ReviewAction.solution_id.in_(ids))
+        )
+        db.session.execute(
+            delete(Solution)
+            .where(Solution.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        db.session.expunge_all()
+        archived += len(ids)
+
+
+def prune_child_sets() -> int:
+    """
+    Delete the child sets that no revision references any more. Returns
+    the number of deleted sets.
+
+    The sets are locked before they are checked again. A revision taking
+    a set in `_find_or_create_set` holds a share lock on it until it
+    commits, so a set is never deleted under a revision about to
+    reference it.
+    """
+    unreferenced = select(ChildSet.id).where(
+        *(
+            ~exists().where(getattr(Solution, column) == ChildSet.id)
+            for column in SET_COLUMNS.values()
+        )
+    )
+    set_ids = db.session.scalars(unreferenced.with_for_update()).all()
+    if set_ids:
+        # revisions committed while waiting for the locks see the new
+        # references
+        set_ids = db.session.scalars(
+            unreferenced.where(ChildSet.id.in_(set_ids))
+        ).all()
+    if not set_ids:
+        db.session.commit()
+        return 0
+
+    for child in (Charm, UseCase, UsefulLink):
+        db.session.execute(delete(child).where(child.set_id.in_(set_ids)))
+    db.session.execute(
+        delete(child_set_maintainer).where(
+            child_set_maintainer.c.set_id.in_(set_ids)
+        )
+    )
+    db.session.execute(delete(ChildSet).where(ChildSet.id.in_(set_ids)))
+    db.session.commit()
+    return len(set_ids)
+
+
+def get_archived_revision(name: str, revision: int):
+    """The serialized revision as it was when it was archived."""
+    archive = (
+        db.session.query(SolutionArchive)
+        .filter(
+            SolutionArchive.name == name,
+            SolutionArchive.revision == revision,
+        )
+        .one_or_none()
+    )
+    return archive.data if archive else None
+
+
+def get_archived_revision_name(hash: str):
+    return (
+        db.session.query(SolutionArchive.name)
+        .filter(SolutionArchive.hash == hash)
+        .scalar()
+    )
+
+
+@click.command("archive-revisions")
+@click.option(
+    "--older-than-days",
+    default=DEFAULT_ARCHIVE_AFTER_DAYS,
+    show_default=True,
+    help="Only archive revisions unpublished for this many days.",
+)
+@click.option(
+    "--batch-size",
+    default=DEFAULT_ARCHIVE_BATCH_SIZE,
+    show_default=True,
+    help="Revisions moved per transaction.",
+)
+@click.option(
+    "--every-hours",
+    type=float,
+    help="Keep running, archiving again after this many hours.",
+)
+@with_appcontext
+def archive_revisions_command(older_than_days, batch_size, every_hours):
+    """Move old UNPUBLISHED revisions out of the live tables."""
+    while True:
+        archived = archive_unpublished_revisions(
+            timedelta(days=older_than_days), batch_size
+        )
+        click.echo(f"Archived {archived} revision(s)")
+        if not every_hours:
+            return
+        db.session.remove()
+        time.sleep(every_hours * 3600)
@@ -0,0 +1,372 @@
+import functools
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# name -> cache, for the status endpoint
+caches = {}
+
+
+@dataclass
+class CacheStats:
+    # lookups answered by a fresh entry
+    hits: int = 0
+    # lookups answered by an expired entry while it is being refreshed
+    stale_hits: int = 0
+    # lookups re-raising a cached failure
+    negative_hits: int = 0
+    # lookups that called the loader
+    misses: int = 0
+    # lookups that waited for the loader call of a concurrent miss
+    coalesced: int = 0
+    # entries dropped to stay within the capacity
+    evictions: int = 0
+    # background refreshes that failed, the stale entry is kept
+    refresh_errors: int = 0
+    # misses answered by the shared cache
+    shared_hits: int = 0
+    # failed reads or writes of the shared cache
+    shared_errors: int = 0
+
+
+class Expiring(NamedTuple):
+    """Loader result that must not be cached longer than `ttl` seconds."""
+
+    value: Any
+    ttl: float
+
+
+@dataclass
+class _Entry:
+    value: Any
+    # failure raised by the loader, cached as a negative result
+    error: Optional[BaseException]
+    expires_at: float
+    stale_until: float
+
+
+class _Flight:
+    """A loader call other lookups of the same key wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache of at most `maxsize` entries expiring `ttl`
+    seconds after they were loaded, shortened by up to `jitter` of the ttl
+    so entries loaded together do not expire together.
+
+    Concurrent misses of a key share one loader call. For `stale_ttl`
+    seconds after expiry an entry is still served while a background
+    thread reloads it. Failures of the loader are cached for
+    `negative_ttl` seconds and re-raised.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 1024,
+        stale_ttl: float = 0,
+        negative_ttl: float = 0,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.jitter = jitter
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]):
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self.clock()
+
+            if entry is not None and now < entry.expires_at:
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    self.stats.negative_hits += 1
+                    # every raise of the shared error extends its traceback
+                    raise entry.error.with_traceback(None)
+                self.stats.hits += 1
+                return entry.value
+
+            if (
+                entry is not None
+                and entry.error is None
+                and now < entry.stale_until
+            ):
+                self._entries.move_to_end(key)
+                self.stats.stale_hits += 1
+                if key not in self._flights:
+                    flight = self._flights[key] = _Flight()
+                    threading.Thread(
+                        target=self._load,
+                        args=(key, loader, flight, True),
+                        daemon=True,
+                    ).start()
+                return entry.value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats.misses += 1
+            else:
+                self.stats.coalesced += 1
+
+        if leader:
+            self._load(key, loader, flight)
+            if flight.error is not None:
+                raise flight.error
+        else:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error.with_traceback(None)
+        return flight.value
+
+    def _load(self, key, loader, flight, refresh=False):
+        ttl = self._ttl(self.ttl)
+        try:
+            flight.value = loader()
+            if isinstance(flight.value, Expiring):
+                ttl = min(ttl, flight.value.ttl)
+                flight.value = flight.value.value
+        except Exception as error:
+            flight.error = error
+
+        with self._lock:
+            del self._flights[key]
+            if flight.error is None:
+                self._store(key, flight.value, None, ttl)
+            elif refresh:
+                # keep serving the stale entry until it runs out
+                self.stats.refresh_errors += 1
+                logger.warning("Refreshing %r failed: %s", key, flight.error)
+            elif self.negative_ttl:
+                self._store(key, None, flight.error, self.negative_ttl)
+        flight.done.set()
+
+    def _ttl(self, ttl: float) -> float:
+        return ttl * (1 - random.uniform(0, self.jitter))
+
+    def _store(self, key, value, error, ttl):
+        expires_at = self.clock() + ttl
+        self._entries[key] = _Entry(
+            value, error, expires_at, expires_at + self.stale_ttl
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def set(self, key: Hashable, value):
+        with self._lock:
+            self._store(key, value, None, self._ttl(self.ttl))
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), **asdict(self.stats)}
+
+
+class SQLiteBackend:
+    """
+    Shared cache in a SQLite file, for the workers of one host. Each
+    thread, and each process after a fork, opens its own connection.
+    """
+
+    # share of writes that also delete the expired entries
+    PURGE_RATE = 0.01
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=1, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get(self, key: str) -> Optional[Expiring]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            )
+            .fetchone()
+        )
+        if row is None or row[1] <= time.time():
+            return None
+        return Expiring(json.loads(row[0]), row[1] - time.time())
+
+    def set(self, key: str, value, ttl: float):
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (key, json.dumps(value), now + ttl),
+        )
+        if random.random() < self.PURGE_RATE:
+            connection.execute(
+                "DELETE FROM cache WHERE expires_at <= ?", (now,)
+            )
+
+
+class RedisBackend:
+    """Shared cache in a Redis-protocol server, for all workers."""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+
+    def get(self, key: str) -> Optional[Expiring]:
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        value, pttl = pipeline.execute()
+        if value is None or pttl <= 0:
+            return None
+        return Expiring(json.loads(value), pttl / 1000)
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+
+def cache_backend(url: Optional[str]):
+    """
+    The shared cache backend of a `CACHE_URL`: `redis://...` (or
+    `rediss://`, `unix://`) for Redis, `sqlite:///path` for a SQLite file,
+    nothing to only cache in process.
+    """
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///") :])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_URL {url}")
+
+
+_shared_backend = None
+
+
+def shared_backend():
+    return _shared_backend
+
+
+def configure_shared_backend(url: Optional[str]):
+    """Share the cached lookups through the backend of `url`."""
+    global _shared_backend
+    _shared_backend = cache_backend(url)
+
+
+def ttl_cache(name: str, ttl: float, shared: bool = False, **options):
+    """
+    Cache the results of a function of hashable arguments in a `TTLCache`
+    registered as `name`, reachable as the `cache` attribute of the
+    decorated function. Its `refresh` attribute calls the function past the
+    cache and caches the fresh result.
+
+    With `shared`, misses are first looked up in the shared backend (see
+    `configure_shared_backend`), which keeps the JSON-serializable results
+    for the other workers. Failures are only cached in process.
+    """
+
+    def decorator(fn):
+        cache = caches[name] = TTLCache(ttl, **options)
+
+        def shared_key(args, kwargs) -> str:
+            return f"{name}:{json.dumps([args, kwargs], sort_keys=True)}"
+
+        def share(backend, key, value):
+            try:
+                backend.set(key, value, cache._ttl(ttl))
+            except Exception as error:
+                cache.stats.shared_errors += 1
+                logger.warning("Writing %s to cache failed: %s", key, error)
+
+        def load(args, kwargs):
+            backend = shared_backend() if shared else None
+            if backend is None:
+                return fn(*args, **kwargs)
+
+            key = shared_key(args, kwargs)
+            try:
+                cached = backend.get(key)
+            except Exception as error:
+                cached = None
+                cache.stats.shared_errors += 1
+                logger.warning("Reading %s from cache failed: %s", key, error)
+            if cached is not None:
+                cache.stats.shared_hits += 1
+                return cached
+
+            value = fn(*args, **kwargs)
+            share(backend, key, value)
+            return value
+
+        @functools.wraps(fn)
+        def wrapped(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return cache.get(key, lambda: load(args, kwargs))
+
+        def refresh(*args, **kwargs):
+            """
+            Call the function past the caches, storing the fresh result in
+            them for the next lookups.
+            """
+            value = fn(*args, **kwargs)
+            cache.set((args, tuple(sorted(kwargs.items()))), value)
+            backend = shared_backend() if shared else None
+            if backend is not None:
+                share(backend, shared_key(args, kwargs), value)
+            return value
+
+        wrapped.cache = cache
+        wrapped.refresh = refresh
+        return wrapped
+
+    return decorator
+
+
+def cache_status() -> dict:
+    return {name: cache.status() for name, cache in caches.items()}
@@ -0,0 +1,184 @@
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import (
+    Charm,
+    ChildSet,
+    Maintainer,
+    UseCase,
+    UsefulLink,
+    child_set_maintainer,
+)
+
+CHARMS = "charms"
+USE_CASES = "use_cases"
+USEFUL_LINKS = "useful_links"
+MAINTAINERS = "maintainers"
+
+# kind of child set -> Solution column referencing it
+SET_COLUMNS = {
+    CHARMS: "charm_set_id",
+    USE_CASES: "use_case_set_id",
+    USEFUL_LINKS: "useful_link_set_id",
+    MAINTAINERS: "maintainer_set_id",
+}
+
+
+def child_set_digest(kind: str, items: list) -> str:
+    payload = json.dumps([kind, items], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _lock_set(digest: str) -> Optional[int]:
+    """
+    The id of the set with `digest`, share locked until the transaction
+    ends so `prune_child_sets` cannot delete it before the revision
+    referencing it commits.
+    """
+    return (
+        db.session.query(ChildSet.id)
+        .filter(ChildSet.digest == digest)
+        .with_for_update(read=True)
+    ).scalar()
+
+
+def _find_or_create_set(kind: str, items: list, rows) -> Optional[int]:
+    """
+    The id of the child set holding `items`, storing it with `rows(set_id)`
+    when no revision referenced these items yet. Empty collections have no
+    set.
+    """
+    if not items:
+        return None
+
+    digest = child_set_digest(kind, items)
+    set_id = _lock_set(digest)
+    if set_id is not None:
+        return set_id
+
+    try:
+        with db.session.begin_nested():
+            child_set = ChildSet(kind=kind, digest=digest)
+            db.session.add(child_set)
+            db.session.flush()
+            table, values = rows(child_set.id)
+            db.session.execute(insert(table), values)
+            return child_set.id
+    except IntegrityError:
+        # another transaction stored the same set first
+        return _lock_set(digest)
+
+
+def charm_items(charm_names: Iterable[str]) -> list:
+    names = []
+    for charm_name in charm_names:
+        name = (charm_name or "").strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _unique_pairs(entries: Iterable[dict], first: str, second: str) -> list:
+    items = []
+    for entry in entries:
+        item = [(entry.get(key) or "").strip() for key in (first, second)]
+        if all(item) and item not in items:
+            items.append(item)
+    return items
+
+
+def use_case_items(use_cases: Iterable[dict]) -> list:
+    return _unique_pairs(use_cases, "title", "description")
+
+
+def useful_link_items(useful_links: Iterable[dict]) -> list:
+    return _unique_pairs(useful_links, "title", "url")
+
+
+def _charm_rows(set_id: int, names: list) -> tuple:
+    return Charm, [{"set_id": set_id, "charm_name": name} for name in names]
+
+
+def _use_case_rows(set_id: int, items: list) -> tuple:
+    return UseCase, [
+        {"set_id": set_id, "title": title, "description": description}
+        for title, description in items
+    ]
+
+
+def _useful_link_rows(set_id: int, items: list) -> tuple:
+    return UsefulLink, [
+        {"set_id": set_id, "title": title, "url": url}
+        for title, url in items
+    ]
+
+
+# kind of item set -> (normalized items of submitted data, normalized item
+# of a stored row, rows of a set)
+ITEM_SETS = {
+    CHARMS: (charm_items, lambda charm: charm.charm_name, _charm_rows),
+    USE_CASES: (
+        use_case_items,
+        lambda case: [case.title, case.description],
+        _use_case_rows,
+    ),
+    USEFUL_LINKS: (
+        useful_link_items,
+        lambda link: [link.title, link.url],
+        _useful_link_rows,
+    ),
+}
+
+
+def submitted_items(kind: str, data: Iterable) -> list:
+    """The normalized items of the submitted data of a set of `kind`."""
+    normalize, _, _ = ITEM_SETS[kind]
+    return normalize(data)
+
+
+def stored_items(kind: str, rows: Iterable) -> list:
+    """The normalized items of the stored rows of a set of `kind`."""
+    _, item, _ = ITEM_SETS[kind]
+    return [item(row) for row in rows]
+
+
+def item_set_id(kind: str, items: list) -> Optional[int]:
+    """The id of the set of `kind` holding the normalized `items`."""
+    _, _, rows = ITEM_SETS[kind]
+    return _find_or_create_set(kind, items, lambda set_id: rows(set_id, items))
+
+
+def charm_set_id(charm_names: Iterable[str]) -> Optional[int]:
+    return item_set_id(CHARMS, charm_items(charm_names))
+
+
+def use_case_set_id(use_cases: Iterable[dict]) -> Optional[int]:
+    return item_set_id(USE_CASES, use_case_items(use_cases))
+
+
+def useful_link_set_id(useful_links: Iterable[dict]) -> Optional[int]:
+    return item_set_id(USEFUL_LINKS, useful_link_items(useful_links))
+
+
+def maintainer_set_id(maintainers: Iterable[Maintainer]) -> Optional[int]:
+    ids = []
+    for maintainer in maintainers:
+        if maintainer.id not in ids:
+            ids.append(maintainer.id)
+
+    return _find_or_create_set(
+        MAINTAINERS,
+        sorted(ids),
+        lambda set_id: (
+            child_set_maintainer,
+            [
+                {"set_id": set_id, "maintainer_id": maintainer_id}
+                for maintainer_id in ids
+            ],
+        ),
+    )
@@ -11,6 +11,8 @@ from flask import (
 )
 from app.models import Solution, SolutionStatus, Publisher
 from app.extensions import db
+from app.pool import pool_status
+from app.cache import cache_status
 from sqlalchemy.orm import joinedload
 from app.reviewer.logic import (
     approve_solution_name,
@@ -69,6 +71,18 @@ def status_check():
     return "OK", 200
 
 
+@dashboard_bp.route("/_status/db-pool")
+def db_pool_status():
+    """Connection pool usage and checkout wait counters."""
+    return jsonify(pool_status(db.engine)), 200
+
+
+@dashboard_bp.route("/_status/cache")
+def cache_status_check():
+    """Size and hit, miss and eviction counters of the lookup caches."""
+    return jsonify(cache_status()), 200
+
+
 @dashboard_bp.route("/")
 @dashboard_login_required
 def dashboard():
@@ -2,9 +2,12 @@ from datetime import datetime
 import enum
 from typing import Optional, List
 from sqlalchemy import (
+    DDL,
+    event,
     Integer,
     String,
     Text,
+    BigInteger,
     JSON,
     DateTime,
     ForeignKey,
@@ -12,11 +15,18 @@ from sqlalchemy import (
     Enum,
     Table,
     CheckConstraint,
+    Index,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.extensions import db
 
 
+# JSONB on PostgreSQL, where GIN indexes answer containment queries
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
+
 class SolutionStatus(enum.Enum):
     # publisher requests new solution
     PENDING_NAME_REVIEW = "pending_name_review"
@@ -47,12 +57,36 @@ class ReviewerActionType(enum.Enum):
     PUBLISH = "publish"
 
 
-# Association table for many-to-many between Solution and Maintainer
-solution_maintainer = Table(
-    "solution_maintainer",
+# Charms, use cases, useful links and maintainers are stored as immutable,
+# content-addressed child sets. Revisions reference the sets holding their
+# collections, so a revision that leaves a collection unchanged shares the
+# set of its parent instead of copying its rows.
+
+
+class ChildSet(db.Model):
+    __tablename__ = "child_set"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # collection held by the set: charms, use_cases, useful_links or
+    # maintainers
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    # sha256 of the kind and the normalized items of the set
+    digest: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True
+    )
+
+
+# Association table for many-to-many between maintainer sets and Maintainer
+child_set_maintainer = Table(
+    "child_set_maintainer",
     db.Model.metadata,
-    db.Column("solution_id", ForeignKey("solution.id"), primary_key=True),
-    db.Column("maintainer_id", ForeignKey("maintainer.id"), primary_key=True),
+    db.Column("set_id", ForeignKey("child_set.id"), primary_key=True),
+    db.Column(
+        "maintainer_id",
+        ForeignKey("maintainer.id"),
+        primary_key=True,
+        index=True,
+    ),
 )
 
 
@@ -85,6 +119,9 @@ class Solution(db.Model):
         Enum(SolutionStatus),
         nullable=False,
         default=SolutionStatus.PENDING_NAME_REVIEW,
+        index=True,
+        # keep the committed value, see `app.public.catalog`
+        active_history=True,
     )
 
     # platform: "kubernetes" or "machine"
@@ -92,9 +129,11 @@ class Solution(db.Model):
         Enum(PlatformTypes), nullable=False
     )
     # list of platform version constraints
-    platform_version: Mapped[Optional[List[str]]] = mapped_column(JSON)
+    platform_version: Mapped[Optional[List[str]]] = mapped_column(JSONList)
     # list of platform prerequisites
-    platform_prerequisites: Mapped[Optional[List[str]]] = mapped_column(JSON)
+    platform_prerequisites: Mapped[Optional[List[str]]] = mapped_column(
+        JSONList
+    )
 
     # documentation links
     documentation_main: Mapped[Optional[str]] = mapped_column(String)
@@ -107,10 +146,10 @@ class Solution(db.Model):
     community_discussion_url: Mapped[Optional[str]] = mapped_column(String)
 
     # compatibility with juju versions
-    juju_versions: Mapped[Optional[List[str]]] = mapped_column(JSON)
+    juju_versions: Mapped[Optional[List[str]]] = mapped_column(JSONList)
 
     publisher_id: Mapped[str] = mapped_column(
-        ForeignKey("publisher.publisher_id"), nullable=False
+        ForeignKey("publisher.publisher_id"), nullable=False, index=True
     )
     publisher: Mapped["Publisher"] = relationship(backref="solutions")
 
@@ -128,24 +167,87 @@ class Solution(db.Model):
     # email address of reviewer who approves solution name and rev1
     approved_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
-    use_cases: Mapped[Optional[List["UseCase"]]] = relationship(
-        back_populates="solution", cascade="all, delete-orphan"
+    # child sets holding the collections of the revision, NULL when empty
+    charm_set_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("child_set.id"), index=True
+    )
+    use_case_set_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("child_set.id"), index=True
+    )
+    useful_link_set_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("child_set.id"), index=True
+    )
+    maintainer_set_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("child_set.id"), index=True
+    )
+
+    use_cases: Mapped[List["UseCase"]] = relationship(
+        primaryjoin="Solution.use_case_set_id == foreign(UseCase.set_id)",
+        order_by="UseCase.id",
+        viewonly=True,
     )
     charms: Mapped[List["Charm"]] = relationship(
-        back_populates="solution", cascade="all, delete-orphan"
+        primaryjoin="Solution.charm_set_id == foreign(Charm.set_id)",
+        order_by="Charm.id",
+        viewonly=True,
     )
     maintainers: Mapped[List["Maintainer"]] = relationship(
-        secondary=solution_maintainer, back_populates="solutions"
+        secondary=child_set_maintainer,
+        primaryjoin=(
+            "Solution.maintainer_set_id"
+            " == foreign(child_set_maintainer.c.set_id)"
+        ),
+        secondaryjoin=(
+            "Maintainer.id == foreign(child_set_maintainer.c.maintainer_id)"
+        ),
+        # maintainer sets are identified by their sorted maintainer ids
+        order_by="Maintainer.id",
+        viewonly=True,
     )
-    useful_links: Mapped[Optional[List["UsefulLink"]]] = relationship(
-        back_populates="solution", cascade="all, delete-orphan"
+    useful_links: Mapped[List["UsefulLink"]] = relationship(
+        primaryjoin=(
+            "Solution.useful_link_set_id == foreign(UsefulLink.set_id)"
+        ),
+        order_by="UsefulLink.id",
+        viewonly=True,
     )
     visibility: Mapped[Visibility] = mapped_column(
-        Enum(Visibility), nullable=False, default=Visibility.PUBLIC
+        Enum(Visibility),
+        nullable=False,
+        default=Visibility.PUBLIC,
+        index=True,
+        active_history=True,
     )
 
     __table_args__ = (
         UniqueConstraint("name", "revision", name="_solution_revision_uc"),
+        Index("ix_solution_name_status", "name", "status"),
+        # at most one published and one draft revision of each solution,
+        # making them direct lookups by name
+        Index(
+            "uq_solution_published_name",
+            "name",
+            unique=True,
+            postgresql_where=text("status = 'PUBLISHED'"),
+            sqlite_where=text("status = 'PUBLISHED'"),
+        ),
+        Index(
+            "uq_solution_draft_name",
+            "name",
+            unique=True,
+            postgresql_where=text("status = 'DRAFT'"),
+            sqlite_where=text("status = 'DRAFT'"),
+        ),
+        *(
+            Index(
+                f"ix_solution_{column}", column, postgresql_using="gin"
+            ).ddl_if(dialect="postgresql")
+            for column in (
+                "platform_version",
+                "platform_prerequisites",
+                "juju_versions",
+            )
+        ),
     )
 
 
@@ -178,12 +280,10 @@ class UseCase(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
-    solution_id: Mapped[int] = mapped_column(
-        ForeignKey("solution.id"), nullable=False
+    set_id: Mapped[int] = mapped_column(
+        ForeignKey("child_set.id"), nullable=False, index=True
     )
 
-    solution: Mapped["Solution"] = relationship(back_populates="use_cases")
-
     def to_dict(self):
         return {
             "id": self.id,
@@ -197,17 +297,15 @@ class Charm(db.Model):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     # charm slug
-    charm_name: Mapped[str] = mapped_column(String, nullable=False)
-    solution_id: Mapped[int] = mapped_column(
-        ForeignKey("solution.id"), nullable=False
+    charm_name: Mapped[str] = mapped_column(
+        String, nullable=False, index=True
+    )
+    set_id: Mapped[int] = mapped_column(
+        ForeignKey("child_set.id"), nullable=False, index=True
     )
-
-    solution: Mapped["Solution"] = relationship(back_populates="charms")
 
     __table_args__ = (
-        UniqueConstraint(
-            "solution_id", "charm_name", name="_solution_charm_uc"
-        ),
+        UniqueConstraint("set_id", "charm_name", name="_charm_set_charm_uc"),
     )
 
     def to_dict(self):
@@ -217,12 +315,10 @@ class Charm(db.Model):
         }
 
 
-"""
-A Maintainer will be a manually entered field by the publisher,
-and will determine the point(s) of contact for the solution.
-All members of the Launchpad group will still be able to edit the solution
-even if they are not listed as Maintainers.
-"""
+# A Maintainer will be a manually entered field by the publisher,
+# and will determine the point(s) of contact for the solution.
+# All members of the Launchpad group will still be able to edit the solution
+# even if they are not listed as Maintainers.
 
 
 class Maintainer(db.Model):
@@ -232,10 +328,6 @@ class Maintainer(db.Model):
     display_name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, nullable=False)
 
-    solutions: Mapped[List["Solution"]] = relationship(
-        secondary=solution_maintainer, back_populates="maintainers"
-    )
-
     def to_dict(self):
         return {
             "id": self.id,
@@ -250,12 +342,10 @@ class UsefulLink(db.Model):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
     url: Mapped[str] = mapped_column(String, nullable=False)
-    solution_id: Mapped[int] = mapped_column(
-        ForeignKey("solution.id"), nullable=False
+    set_id: Mapped[int] = mapped_column(
+        ForeignKey("child_set.id"), nullable=False, index=True
     )
 
-    solution: Mapped["Solution"] = relationship(back_populates="useful_links")
-
     def to_dict(self):
         return {
             "id": self.id,
@@ -269,7 +359,7 @@ class ReviewAction(db.Model):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     solution_id: Mapped[int] = mapped_column(
-        ForeignKey("solution.id"), nullable=False
+        ForeignKey("solution.id"), nullable=False, index=True
     )
     # Canonical email
     reviewer_id: Mapped[str] = mapped_column(String, nullable=False)
@@ -280,3 +370,103 @@ class ReviewAction(db.Model):
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     solution: Mapped["Solution"] = relationship(backref="review_actions")
+
+
+# Revisions compacted out of the live tables once they were UNPUBLISHED (see
+# app/archive.py). Each row keeps the revision, its child rows and its review
+# actions serialized as they were, for history views and old preview links.
+
+
+class SolutionArchive(db.Model):
+    __tablename__ = "solution_archive"
+
+    # id the revision had in the solution table
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hash: Mapped[str] = mapped_column(String(16), nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    publisher_id: Mapped[str] = mapped_column(String, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now
+    )
+    # serialized revision, with its child rows and review actions
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "name", "revision", name="_solution_archive_revision_uc"
+        ),
+    )
+
+
+class CatalogState(db.Model):
+    """
+    Single row counting the committed transactions that changed a row
+    serialized in the public catalog (see `app.public.catalog`).
+    """
+
+    __tablename__ = "catalog_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    serial: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+event.listen(
+    CatalogState.__table__,
+    "after_create",
+    DDL("INSERT INTO catalog_state (id, serial) VALUES (1, 0)"),
+)
+
+
+# Full-text search over published public solutions.
+# PostgreSQL keeps a weighted tsvector in a generated column with a GIN index,
+# SQLite keeps an FTS5 table in sync through triggers. Neither is mapped on
+# the model, the public search logic queries them directly.
+
+SOLUTION_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE solution ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+        ") STORED",
+        "CREATE INDEX ix_solution_search_vector ON solution "
+        "USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE solution_fts "
+        "USING fts5(title, summary, description)",
+        "CREATE TRIGGER solution_fts_insert AFTER INSERT ON solution "
+        "WHEN new.status = 'PUBLISHED' AND new.visibility = 'PUBLIC' "
+        "BEGIN "
+        "INSERT INTO solution_fts (rowid, title, summary, description) "
+        "VALUES (new.id, new.title, new.summary, new.description); "
+        "END",
+        "CREATE TRIGGER solution_fts_update AFTER UPDATE ON solution "
+        "BEGIN "
+        "DELETE FROM solution_fts WHERE rowid = old.id; "
+        "INSERT INTO solution_fts (rowid, title, summary, description) "
+        "SELECT new.id, new.title, new.summary, new.description "
+        "WHERE new.status = 'PUBLISHED' AND new.visibility = 'PUBLIC'; "
+        "END",
+        "CREATE TRIGGER solution_fts_delete AFTER DELETE ON solution "
+        "BEGIN "
+        "DELETE FROM solution_fts WHERE rowid = old.id; "
+        "END",
+    ],
+}
+
+for dialect, statements in SOLUTION_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(
+            Solution.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect=dialect),
+        )
+
+event.listen(
+    Solution.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS solution_fts").execute_if(dialect="sqlite"),
+)
@@ -1,21 +1,147 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, current_app
 from app.models import Publisher, Solution
+from app.public.catalog import catalog_snapshot
+from app.public.search import (
+    DEFAULT_SUGGESTIONS,
+    FACETS,
+    MAX_SUGGESTIONS,
+    search_index,
+)
 from app.public.logic import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    count_published_solutions,
     get_all_published_solutions,
+    get_published_solutions_by_charm,
+    get_published_solutions_page,
     get_published_solution_by_name,
     get_published_solution_by_hash,
+    get_published_solution_validators,
+    get_preview_solution_validators,
     search_published_solutions,
 )
-from app.public.auth import login_required, verify_signature
+from app.public.auth import (
+    encode_jwt_token,
+    login_required,
+    verify_signature,
+)
 from app.public.launchpad import get_user_teams
-import os
+from app.replica import read_replica
+from app.utils import make_etag, parse_fields
+from app.exceptions import ValidationError
+from werkzeug.http import is_resource_modified
+import logging
 import time
-import jwt
+
+logger = logging.getLogger(__name__)
 
 public_bp = Blueprint("public", __name__)
 
 JWT_EXPIRATION = 86400  # 24 hours
-SECRET_KEY = os.environ["FLASK_SECRET_KEY"]
+
+
+def _catalog_validators(version, *args):
+    etag = make_etag(*version, *args)
+    return etag, version.last_updated
+
+
+def _page_args():
+    """
+    Return the (limit, after) pagination arguments of the request, or None
+    when the client asked for the full, unpaginated list.
+    """
+    if "limit" not in request.args and "after" not in request.args:
+        return None
+
+    limit = _limit_arg(DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    return limit, request.args.get("after") or None
+
+
+def _limit_arg(default: int, maximum: int) -> int:
+    """Return the `limit` argument of the request, from 1 to `maximum`."""
+    try:
+        limit = int(request.args.get("limit", default))
+    except ValueError:
+        limit = None
+    if limit is None or not 1 <= limit <= maximum:
+        raise ValidationError(
+            [
+                {
+                    "code": "invalid-limit",
+                    "message": "Limit must be a number between 1 and "
+                    f"{maximum}.",
+                }
+            ]
+        )
+    return limit
+
+
+def _facets_arg():
+    """
+    Return the facets to count of the request, all of them when the client
+    did not pick any.
+    """
+    if "facets" not in request.args:
+        return None
+
+    facets = [f for f in request.args["facets"].split(",") if f]
+    unknown = [facet for facet in facets if facet not in FACETS]
+    if unknown:
+        raise ValidationError(
+            [
+                {
+                    "code": "invalid-facets",
+                    "message": "Unknown facets: " + ", ".join(unknown),
+                }
+            ]
+        )
+    return facets
+
+
+def _filter_args():
+    """Return the facet filters of the request, as facet -> values."""
+    return {
+        facet: values
+        for facet in FACETS
+        if (values := [v for v in request.args.getlist(facet) if v])
+    }
+
+
+def _select_fields(solutions, fields):
+    if not fields:
+        return solutions
+    return [
+        {field: solution[field] for field in fields} for solution in solutions
+    ]
+
+
+def _search_in_memory():
+    return current_app.config.get("SEARCH_BACKEND", "memory") == "memory"
+
+
+def _solution_validators(validators):
+    hash, last_updated, *linked = validators
+    return make_etag(hash, last_updated, *linked), last_updated
+
+
+def _not_modified(etag, last_modified):
+    """
+    Return a 304 response if the client's If-None-Match or
+    If-Modified-Since validators still match, otherwise None.
+    """
+    if is_resource_modified(
+        request.environ, etag=etag, last_modified=last_modified
+    ):
+        return None
+    response = current_app.response_class(status=304)
+    return _set_validators(response, etag, last_modified)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
 
 
 @public_bp.route("/login", methods=["POST"])
@@ -31,18 +157,41 @@ def login():
     if not verify_signature(username, timestamp, signature):
         return jsonify({"error": "Invalid or expired signature"}), 403
 
-    payload = {
-        "sub": username,
-        "iat": int(time.time()),
-        "exp": int(time.time()) + JWT_EXPIRATION,
-    }
-    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    teams = None
+    if current_app.config.get("JWT_TEAMS_CLAIM"):
+        try:
+            # the teams last as long as the token, never start from a
+            # cached lookup that may be up to an hour old
+            teams = get_user_teams.refresh(username)
+        except Exception as e:
+            # the teams are looked up per request instead
+            logger.warning(f"Could not resolve teams of {username}: {e}")
+
+    token = encode_jwt_token(
+        username, int(time.time()) + JWT_EXPIRATION, teams
+    )
+    return jsonify({"token": token})
+
+
+@public_bp.route("/login/refresh", methods=["POST"])
+@login_required
+def refresh_login():
+    """
+    Re-issue the token of the user with freshly resolved teams. The new
+    token expires with the original one.
+    """
+    username = g.user["username"]
+    teams = None
+    if current_app.config.get("JWT_TEAMS_CLAIM"):
+        teams = get_user_teams.refresh(username)
 
+    token = encode_jwt_token(username, g.token_payload["exp"], teams)
     return jsonify({"token": token})
 
 
 @public_bp.route("/me", methods=["GET"])
 @login_required
+@read_replica
 def get_current_user():
     teams = g.user.get("teams", [])
     publishers = Publisher.query.filter(Publisher.username.in_(teams)).all()
@@ -51,32 +200,209 @@ def get_current_user():
 
 
 @public_bp.route("/solutions", methods=["GET"])
+@read_replica
 def list_published_solutions():
-    solutions = get_all_published_solutions()
-    return jsonify(solutions), 200
+    try:
+        page_args = _page_args()
+        fields = parse_fields(
+            request.args.get("fields"), include_private=False
+        )
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    filters = _filter_args()
+    if filters:
+        return filter_published_solutions(page_args, fields, filters)
+    if page_args or fields:
+        return query_published_solutions(page_args, fields)
+
+    not_modified = _not_modified(
+        *_catalog_validators(catalog_snapshot.version())
+    )
+    if not_modified:
+        return not_modified
+
+    version, body = catalog_snapshot.get()
+    response = current_app.response_class(body, mimetype="application/json")
+    return _set_validators(response, *_catalog_validators(version))
+
+
+def query_published_solutions(page_args, fields):
+    """
+    Catalog listings that cannot be served from the snapshot: a page of
+    the catalog, or a sparse fieldset that only loads what it emits.
+    """
+    version = catalog_snapshot.version()
+    etag, last_modified = _catalog_validators(version, page_args, fields)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    if not page_args:
+        solutions = get_all_published_solutions(fields)
+        return _set_validators(jsonify(solutions), etag, last_modified), 200
+
+    try:
+        page = get_published_solutions_page(*page_args, fields=fields)
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    page["total"] = version.count
+    return _set_validators(jsonify(page), etag, last_modified), 200
+
+
+def filter_published_solutions(page_args, fields, filters):
+    """
+    Faceted catalog listings, answered from the search index with the
+    facet counts of the filtered catalog, or from the database indexes
+    without facet counts.
+    """
+    try:
+        facets = _facets_arg()
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    version = catalog_snapshot.version()
+    etag, last_modified = _catalog_validators(
+        version, page_args, fields, sorted(filters.items()), facets
+    )
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    limit, after = page_args or (DEFAULT_PAGE_SIZE, None)
+    try:
+        if _search_in_memory():
+            page = search_index.search_page(
+                None, version, limit, after, filters=filters, facets=facets
+            )
+            page["solutions"] = _select_fields(page["solutions"], fields)
+        else:
+            page = get_published_solutions_page(
+                limit, after, fields=fields, filters=filters
+            )
+            page["total"] = count_published_solutions(filters=filters)
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    return _set_validators(jsonify(page), etag, last_modified), 200
 
 
 @public_bp.route("/solutions/<string:name>", methods=["GET"])
+@read_replica
 def get_solution(name):
+    validators = get_published_solution_validators(name)
+    if not validators:
+        return jsonify({"error": "Solution not found"}), 404
+
+    etag, last_modified = _solution_validators(validators)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified:
+        return not_modified
+
     solution = get_published_solution_by_name(name)
     if not solution:
         return jsonify({"error": "Solution not found"}), 404
-    return jsonify(solution), 200
+    return _set_validators(jsonify(solution), etag, last_modified), 200
 
 
 @public_bp.route("/solutions/search", methods=["GET"])
+@read_replica
 def search_solutions():
     query = request.args.get("q", "")
+    filters = _filter_args()
+
+    try:
+        page_args = _page_args()
+        if _search_in_memory():
+            return search_solutions_in_memory(query, page_args, filters)
+        if (page_args or filters) and not query:
+            return jsonify({"solutions": [], "next": None, "total": 0}), 200
+        if page_args or filters:
+            limit, after = page_args or (DEFAULT_PAGE_SIZE, None)
+            page = get_published_solutions_page(
+                limit, after, query=query, filters=filters
+            )
+            page["total"] = (
+                count_published_solutions(query, filters)
+                if filters
+                else catalog_snapshot.count(query)
+            )
+            return jsonify(page), 200
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
     results = search_published_solutions(query)
     return jsonify(results), 200
 
 
+def search_solutions_in_memory(query, page_args, filters):
+    version = catalog_snapshot.version()
+    if page_args or filters:
+        limit, after = page_args or (DEFAULT_PAGE_SIZE, None)
+        page = search_index.search_page(
+            query, version, limit, after, filters=filters, facets=_facets_arg()
+        )
+        return jsonify(page)
+    return jsonify(search_index.search(query, version))
+
+
+@public_bp.route("/solutions/suggest", methods=["GET"])
+@read_replica
+def suggest_solutions():
+    try:
+        limit = _limit_arg(DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS)
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    suggestions = search_index.suggest(
+        request.args.get("q", ""), catalog_snapshot.version(), limit
+    )
+    return jsonify(suggestions), 200
+
+
+@public_bp.route("/charms/<string:charm_name>/solutions", methods=["GET"])
+@read_replica
+def get_charm_solutions(charm_name):
+    try:
+        fields = parse_fields(
+            request.args.get("fields"), include_private=False
+        )
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    version = catalog_snapshot.version()
+    etag, last_modified = _catalog_validators(version, charm_name, fields)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    if _search_in_memory():
+        solutions = _select_fields(
+            search_index.solutions_with_charm(charm_name, version), fields
+        )
+    else:
+        solutions = get_published_solutions_by_charm(charm_name, fields)
+
+    return _set_validators(jsonify(solutions), etag, last_modified), 200
+
+
 @public_bp.route("/solutions/preview/<string:uuid>", methods=["GET"])
+@read_replica
 def get_solution_preview(uuid):
+    validators = get_preview_solution_validators(uuid)
+    if not validators:
+        return jsonify({"error": "Solution not found"}), 404
+
+    etag, last_modified = _solution_validators(validators)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified:
+        return not_modified
+
     solution = get_published_solution_by_hash(uuid)
     if not solution:
         return jsonify({"error": "Solution not found"}), 404
-    return jsonify(solution), 200
+    return _set_validators(jsonify(solution), etag, last_modified), 200
 
 
 @public_bp.route("/solutions/check-name/<string:name>", methods=["GET"])
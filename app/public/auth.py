@@ -3,10 +3,11 @@ import hashlib
 import time
 import os
 from functools import wraps
-from flask import request, abort, g
+from flask import current_app, request, abort, g
 import jwt
 import logging
 
+from app.cache import Expiring, TTLCache, caches
 from app.public.launchpad import get_user_teams
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,78 @@ def decode_jwt_token(token):
         abort(401, description="Invalid token")
 
 
+class VerifiedTokenCache(TTLCache):
+    """
+    Payloads of verified tokens by the digest of the token, kept until the
+    token expires. Invalid tokens are cached as negative results. The
+    verifications are timed to estimate the time saved by the hits.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.verifications = 0
+        self.verification_seconds = 0.0
+
+    def verify(self, token):
+        key = hashlib.sha256(token.encode()).hexdigest()
+        return self.get(key, lambda: self._verify(token))
+
+    def _verify(self, token):
+        start = time.perf_counter()
+        try:
+            payload = decode_jwt_token(token)
+        finally:
+            with self._lock:
+                self.verifications += 1
+                self.verification_seconds += time.perf_counter() - start
+
+        if "exp" in payload:
+            return Expiring(payload, payload["exp"] - time.time())
+        return payload
+
+    def status(self) -> dict:
+        status = super().status()
+        with self._lock:
+            average = self.verification_seconds / max(self.verifications, 1)
+            status.update(
+                verifications=self.verifications,
+                verification_seconds=round(self.verification_seconds, 6),
+                saved_seconds=round(
+                    average * (self.stats.hits + self.stats.negative_hits), 6
+                ),
+            )
+        return status
+
+
+# sized by the JWT_CACHE_SIZE setting in create_app
+verified_tokens = caches["verified-tokens"] = VerifiedTokenCache(
+    ttl=3600, negative_ttl=60
+)
+
+
+def encode_jwt_token(username, expires_at, teams=None):
+    """
+    Issue a JWT for the user, valid until `expires_at`. When given, the
+    user's teams are embedded with their own, shorter expiry `teams_exp`.
+    """
+    now = int(time.time())
+    payload = {"sub": username, "iat": now, "exp": expires_at}
+
+    if teams is not None:
+        max_age = current_app.config["JWT_TEAMS_MAX_AGE"]
+        payload["teams"] = teams
+        payload["teams_exp"] = min(now + max_age, expires_at)
+
+    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+
+
+def token_teams(payload):
+    """The teams embedded in the token, or None once they are stale."""
+    if "teams" not in payload or payload.get("teams_exp", 0) <= time.time():
+        return None
+    return payload["teams"]
+
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -56,9 +129,12 @@ def login_required(f):
             abort(401, description="Missing or invalid Authorization header")
 
         token = auth_header.split(" ")[1]
-        payload = decode_jwt_token(token)
-        teams = get_user_teams(payload["sub"])
+        payload = verified_tokens.verify(token)
+        teams = token_teams(payload)
+        if teams is None:
+            teams = get_user_teams(payload["sub"])
 
+        g.token_payload = payload
         g.user = {
             "username": payload["sub"],
             "teams": teams,
@@ -0,0 +1,236 @@
+import itertools
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, inspect, update
+
+from app.extensions import db
+from app.models import (
+    CatalogState,
+    Maintainer,
+    Publisher,
+    Solution,
+    SolutionStatus,
+    Visibility,
+    child_set_maintainer,
+)
+from app.public.logic import (
+    CatalogVersion,
+    count_published_solutions,
+    get_all_published_solutions,
+    get_published_catalog_version,
+)
+from app.public.search import search_index
+from app.replica import RoutingSession
+
+SEARCH_COUNT_CACHE_SIZE = 1024
+
+# models with rows serialized in the public catalog, the shared ones are
+# included in the output of every solution linked to them
+SHARED_CATALOG_MODELS = (Publisher, Maintainer)
+CATALOG_MODELS = (Solution, *SHARED_CATALOG_MODELS)
+
+
+class CatalogSnapshot:
+    """
+    Per-worker copy of the published public catalog, kept as the encoded
+    JSON body served by `GET /api/solutions`.
+
+    Each snapshot is tagged with the `CatalogVersion` it was built from.
+    The current version comes from one aggregate query, cached for
+    `CATALOG_VERSION_MAX_AGE` seconds, so conditional requests can be
+    answered and changes committed by other workers are picked up without
+    serializing the catalog. Commits in this worker drop the cached
+    version straight away (see `published_solution_changed`).
+
+    The version also carries the catalog size, which together with a
+    small per-version cache of search match counts provides the total
+    hints of paginated responses.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = None
+        self._version = None
+        self._version_checked_at = 0.0
+        self._counts = {}
+        self._counts_version = None
+
+    def version(self) -> CatalogVersion:
+        version = self._version
+        max_age = current_app.config.get("CATALOG_VERSION_MAX_AGE") or 0
+        now = time.monotonic()
+
+        if version is None or now - self._version_checked_at > max_age:
+            version = get_published_catalog_version()
+            self._version = version
+            self._version_checked_at = now
+
+        return version
+
+    def get(self) -> tuple[CatalogVersion, bytes]:
+        version = self.version()
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            return entry
+
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != version:
+                # a commit racing the build leaves a body newer than its
+                # version, the next version check rebuilds it
+                entry = (version, self._encode())
+                self._entry = entry
+            return entry
+
+    def count(self, query: str = None) -> int:
+        version = self.version()
+        if not query:
+            return version.count
+
+        if self._counts_version != version:
+            self._counts = {}
+            self._counts_version = version
+
+        count = self._counts.get(query)
+        if count is None:
+            count = count_published_solutions(query)
+            if len(self._counts) >= SEARCH_COUNT_CACHE_SIZE:
+                self._counts.clear()
+            self._counts[query] = count
+        return count
+
+    def invalidate(self):
+        self._version = None
+        self._entry = None
+
+    def _encode(self) -> bytes:
+        solutions = get_all_published_solutions()
+        return f"{current_app.json.dumps(solutions)}\n".encode()
+
+
+catalog_snapshot = CatalogSnapshot()
+
+
+def published_solution_changed(name: str):
+    """
+    Called after a commit that changes the published revision of a solution.
+    """
+    changes = db.session.info.get("committed_catalog_changes", ())
+    catalog_snapshot.invalidate()
+    search_index.refresh(name, shared_changed="shared" in changes)
+
+
+def _is_published(solution, committed=False) -> bool:
+    """
+    Whether `solution` is a published public revision, as committed or as
+    about to be flushed.
+    """
+    state = inspect(solution)
+    values = []
+    for key in ("status", "visibility"):
+        history = state.attrs[key].load_history()
+        if committed:
+            values.append((history.deleted or history.unchanged or [None])[0])
+        else:
+            values.append((history.added or history.unchanged or [None])[0])
+    status, visibility = values
+    # new solutions are public by default
+    return status == SolutionStatus.PUBLISHED and visibility in (
+        Visibility.PUBLIC,
+        None,
+    )
+
+
+def _is_linked_to_published(session, obj) -> bool:
+    query = session.query(Solution.id).filter(
+        Solution.status == SolutionStatus.PUBLISHED,
+        Solution.visibility == Visibility.PUBLIC,
+    )
+    if isinstance(obj, Publisher):
+        query = query.filter(Solution.publisher_id == obj.publisher_id)
+    else:
+        query = query.join(
+            child_set_maintainer,
+            child_set_maintainer.c.set_id == Solution.maintainer_set_id,
+        ).filter(child_set_maintainer.c.maintainer_id == obj.id)
+    with session.no_autoflush:
+        return query.limit(1).first() is not None
+
+
+def _record_catalog_change(session, shared=False):
+    changes = session.info.setdefault("catalog_changes", set())
+    changes.add("shared" if shared else "solution")
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _flush_catalog_change(session, flush_context, instances):
+    for obj in itertools.chain(session.new, session.deleted):
+        if isinstance(obj, Solution) and _is_published(
+            obj, committed=obj in session.deleted
+        ):
+            _record_catalog_change(session)
+        elif isinstance(obj, SHARED_CATALOG_MODELS) and obj in session.deleted:
+            _record_catalog_change(session, shared=True)
+
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Solution) and (
+            _is_published(obj, committed=True) or _is_published(obj)
+        ):
+            _record_catalog_change(session)
+        elif isinstance(
+            obj, SHARED_CATALOG_MODELS
+        ) and _is_linked_to_published(session, obj):
+            _record_catalog_change(session, shared=True)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _bulk_catalog_change(orm_execute_state):
+    # bulk statements are not inspected, they count as a change
+    mapper = orm_execute_state.bind_mapper
+    if (
+        (orm_execute_state.is_update or orm_execute_state.is_delete)
+        and mapper is not None
+        and issubclass(mapper.class_, CATALOG_MODELS)
+    ):
+        _record_catalog_change(
+            orm_execute_state.session,
+            shared=issubclass(mapper.class_, SHARED_CATALOG_MODELS),
+        )
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _commit_catalog_change(session):
+    """
+    Increment `CatalogState.serial` once per transaction changing the
+    public catalog. The increment is the last statement before the commit,
+    so the row is only locked while the transaction commits, and catalog
+    changes still commit one serial each.
+    """
+    if session.in_nested_transaction():
+        return
+    session.flush()
+    if session.info.get("catalog_changes"):
+        table = CatalogState.__table__
+        session.connection().execute(
+            update(table).values(serial=table.c.serial + 1)
+        )
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _committed_catalog_change(session):
+    if not session.in_nested_transaction():
+        session.info["committed_catalog_changes"] = session.info.pop(
+            "catalog_changes", set()
+        )
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _end_catalog_change(session, transaction):
+    # changes of a rolled back savepoint still count, which only costs
+    # an extra increment
+    if transaction.parent is None:
+        session.info.pop("catalog_changes", None)
@@ -1,36 +1,63 @@
 import requests
-import functools
-import time
+import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.cache import ttl_cache
 
 LAUNCHPAD_URL = "https://api.launchpad.net/1.0/"
-LAUNCHPAD_TIMEOUT = 10
+# (connect, read) seconds: an unreachable Launchpad fails fast, a slow one
+# holds a worker thread for at most the read timeout per attempt
+LAUNCHPAD_TIMEOUT = (3.05, 10)
+# connections kept alive to api.launchpad.net
+LAUNCHPAD_POOL_SIZE = 10
+LAUNCHPAD_RETRIES = 2
 
-def time_cache(max_age, maxsize=128):
-    """Least-recently-used cache decorator with time-based cache invalidation.
 
-    Args:
-        max_age: Time to live for cached results (in seconds).
-        maxsize: Maximum cache size (see `functools.lru_cache`).
+def _launchpad_session():
     """
-    def _decorator(fn):
-        @functools.lru_cache(maxsize=maxsize)
-        def _new(*args, __time_salt, **kwargs):
-            return fn(*args, **kwargs)
-
-        @functools.wraps(fn)
-        def _wrapped(*args, **kwargs):
-            # this is a trick to "turn" the lru_cache into a time-based cache
-            return _new(*args, **kwargs, __time_salt=int(time.time() / max_age))
-
-        return _wrapped
-
-    return _decorator
-
-
-@time_cache(max_age=3600)
+    Session reusing keep-alive connections to Launchpad. GET requests are
+    retried on connection errors and overload responses with jittered
+    exponential backoff, but not after a read timeout, so a slow Launchpad
+    is not waited for twice.
+    """
+    retry = Retry(
+        total=LAUNCHPAD_RETRIES,
+        read=0,
+        backoff_factor=0.2,
+        backoff_jitter=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=LAUNCHPAD_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+launchpad_session = _launchpad_session()
+# a forked worker must not share the keep-alive sockets of its parent
+os.register_at_fork(after_in_child=launchpad_session.close)
+
+
+# the cache is sized by the LAUNCHPAD_TEAMS_CACHE_SIZE setting in create_app
+@ttl_cache(
+    "launchpad-user-teams",
+    ttl=3600,
+    shared=True,
+    # teams are served up to 10 minutes past expiry while they refresh
+    stale_ttl=600,
+    # failed lookups are retried after 30 seconds
+    negative_ttl=30,
+)
 def get_user_teams(username):
     url = f"{LAUNCHPAD_URL}/~{username}/super_teams"
-    response = requests.get(url, timeout=LAUNCHPAD_TIMEOUT)
+    response = launchpad_session.get(url, timeout=LAUNCHPAD_TIMEOUT)
 
     if response.status_code != 200:
         raise Exception(
@@ -41,11 +68,12 @@ def get_user_teams(username):
     return [team["name"] for team in teams]
 
 
+@ttl_cache("launchpad-team", ttl=600, shared=True, negative_ttl=30)
 def get_launchpad_team(team_name):
     url = f"{LAUNCHPAD_URL}/~{team_name}"
 
     try:
-        response = requests.get(url, timeout=LAUNCHPAD_TIMEOUT)
+        response = launchpad_session.get(url, timeout=LAUNCHPAD_TIMEOUT)
 
         if response.status_code == 404:
             return None
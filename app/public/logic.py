@@ -1,6 +1,53 @@
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import (
+    and_,
+    cast,
+    column,
+    func,
+    false,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, JSONB
+from sqlalchemy.orm import load_only
+from app.archive import get_archived_revision_name
+from app.exceptions import ValidationError
 from app.extensions import db
-from app.models import Solution, SolutionStatus, Visibility
-from app.utils import serialize_public_solution
+from app.models import (
+    CatalogState,
+    Charm,
+    Maintainer,
+    PlatformTypes,
+    Publisher,
+    Solution,
+    SolutionStatus,
+    Visibility,
+    child_set_maintainer,
+)
+from app.utils import (
+    PUBLIC_SOLUTION_LOAD_OPTIONS,
+    serialize_public_solution,
+    solution_load_options,
+)
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# SQLite full-text index of published solutions, kept in sync by triggers
+SOLUTION_FTS = "solution_fts"
+solution_fts = table(SOLUTION_FTS, column("rowid"))
+# bm25 weights of the title, summary and description columns
+SQLITE_FTS_WEIGHTS = (10.0, 5.0, 1.0)
 
 
 def _published_public_filter():
@@ -10,48 +57,259 @@ def _published_public_filter():
     )
 
 
-def get_all_published_solutions():
+def json_list_contains(json_column, value):
+    """
+    Rows whose JSON list column contains `value`. On PostgreSQL this is
+    JSONB containment (`@>`), answered by the GIN index of the column.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return type_coerce(json_column, JSONB).contains([value])
+
+    elements = func.json_each(json_column).table_valued("value")
+    return (
+        db.session.query(elements).filter(elements.c.value == value).exists()
+    )
+
+
+def _facet_filters(filters) -> list:
+    """
+    SQL predicates of facet filters (facet -> accepted values), the SQL
+    counterpart of the facets of the in-memory search index.
+    """
+    predicates = []
+    for facet, values in (filters or {}).items():
+        if not values:
+            continue
+        if facet == "platform":
+            platforms = [p for p in PlatformTypes if p.value in values]
+            predicates.append(
+                Solution.platform.in_(platforms) if platforms else false()
+            )
+        elif facet in ("platform_version", "juju_versions"):
+            json_column = getattr(Solution, facet)
+            predicates.append(
+                or_(*(json_list_contains(json_column, v) for v in values))
+            )
+        elif facet == "publisher":
+            predicates.append(
+                Solution.publisher.has(Publisher.username.in_(values))
+            )
+        elif facet == "charm":
+            predicates.append(
+                Solution.charms.any(Charm.charm_name.in_(values))
+            )
+    return predicates
+
+
+def get_all_published_solutions(fields=None):
     solutions = (
-        db.session.query(Solution).filter(*_published_public_filter()).all()
+        db.session.query(Solution)
+        .options(*solution_load_options(fields, include_private=False))
+        .filter(*_published_public_filter())
+        .all()
     )
-    return [serialize_public_solution(solution) for solution in solutions]
+    return [
+        serialize_public_solution(solution, fields) for solution in solutions
+    ]
 
 
 def get_published_solution_by_name(name: str):
     solution = (
         db.session.query(Solution)
+        .options(*PUBLIC_SOLUTION_LOAD_OPTIONS)
         .filter(
             Solution.name == name,
             *_published_public_filter(),
         )
-        .order_by(Solution.revision.desc())
-        .first()
+        .one_or_none()
     )
     return serialize_public_solution(solution) if solution else None
 
 
+def get_published_solutions_by_charm(charm_name: str, fields=None):
+    solutions = (
+        db.session.query(Solution)
+        .options(*solution_load_options(fields, include_private=False))
+        .filter(
+            Solution.charm_set_id.in_(
+                db.session.query(Charm.set_id).filter(
+                    Charm.charm_name == charm_name
+                )
+            ),
+            *_published_public_filter(),
+        )
+        .order_by(Solution.name)
+        .all()
+    )
+    return [
+        serialize_public_solution(solution, fields) for solution in solutions
+    ]
+
+
+def _search_filter(query: str):
+    return (
+        Solution.title.ilike(f"%{query}%")
+        | Solution.summary.ilike(f"%{query}%")
+        | Solution.description.ilike(f"%{query}%")
+    )
+
+
+def _search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _full_text_search(results, query: str):
+    """
+    Restrict `results` to solutions matching every term of `query` as a
+    prefix, using the full-text index of the database (see models).
+    Returns the filtered query and a relevance score, lower is better.
+    """
+    terms = _search_terms(query)
+    dialect = db.engine.dialect.name
+
+    if dialect == "postgresql":
+        search_vector = literal_column("solution.search_vector")
+        tsquery = func.to_tsquery(
+            "english", " & ".join(f"{term}:*" for term in terms)
+        )
+        score = -cast(func.ts_rank(search_vector, tsquery), DOUBLE_PRECISION)
+        return results.filter(search_vector.op("@@")(tsquery)), score
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        score = func.bm25(literal_column(SOLUTION_FTS), *SQLITE_FTS_WEIGHTS)
+        results = results.join(
+            solution_fts, solution_fts.c.rowid == Solution.id
+        ).filter(literal_column(SOLUTION_FTS).op("MATCH")(match))
+        return results, score
+
+    return results.filter(_search_filter(query)), literal(0)
+
+
 def search_published_solutions(query: str):
-    if not query:
+    if not _search_terms(query):
         return []
 
+    results, score = _full_text_search(
+        db.session.query(Solution)
+        .options(*PUBLIC_SOLUTION_LOAD_OPTIONS)
+        .filter(*_published_public_filter()),
+        query,
+    )
+    results = results.order_by(score, Solution.name, Solution.id).all()
+    return [serialize_public_solution(solution) for solution in results]
+
+
+def encode_cursor(*key) -> str:
+    """Opaque cursor pointing just after the row with the given sort key."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types) -> list:
+    """Decode a cursor whose sort key values have the given types."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError(cursor)
+        for value, value_type in zip(key, types):
+            if isinstance(value, bool) or not isinstance(value, value_type):
+                raise ValueError(cursor)
+        return key
+    except (binascii.Error, ValueError, TypeError):
+        raise ValidationError(
+            [{"code": "invalid-cursor", "message": "Cursor is invalid"}]
+        )
+
+
+def _keyset_after(columns, values):
+    """Rows sorting after `values` in ascending `columns` order."""
+    return or_(
+        *(
+            and_(
+                *(c == v for c, v in zip(columns[:index], values)),
+                column > value,
+            )
+            for index, (column, value) in enumerate(zip(columns, values))
+        )
+    )
+
+
+def get_published_solutions_page(
+    limit: int,
+    after: str = None,
+    query: str = None,
+    fields=None,
+    filters=None,
+):
+    """
+    Return one page of published solutions and the cursor of the next page
+    if there is one. Listings are ordered by (name, id), search results by
+    relevance first. Pages are read with a keyset predicate on that order,
+    so their cost does not depend on how deep the cursor is.
+    """
     results = (
         db.session.query(Solution)
+        .options(*solution_load_options(fields, include_private=False))
+        .filter(*_published_public_filter(), *_facet_filters(filters))
+    )
+    keys = [Solution.name, Solution.id]
+    key_types = [str, int]
+
+    if query and not _search_terms(query):
+        return {"solutions": [], "next": None}
+
+    if query:
+        results, score = _full_text_search(results, query)
+        keys.insert(0, score)
+        key_types.insert(0, (int, float))
+
+    if after:
+        results = results.filter(
+            _keyset_after(keys, decode_cursor(after, *key_types))
+        )
+
+    rows = (
+        results.add_columns(*keys).order_by(*keys).limit(limit + 1).all()
+    )
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "solutions": [
+            serialize_public_solution(row[0], fields) for row in rows
+        ],
+        "next": encode_cursor(*rows[-1][1:]) if has_next else None,
+    }
+
+
+def count_published_solutions(query: str = None, filters=None) -> int:
+    results = db.session.query(func.count(Solution.id)).filter(
+        *_published_public_filter(), *_facet_filters(filters)
+    )
+    if query and not _search_terms(query):
+        return 0
+
+    if query:
+        results, _ = _full_text_search(results, query)
+    return results.scalar()
+
+
+def _find_published_by_name(name: str, *options):
+    return (
+        db.session.query(Solution)
+        .options(*options)
         .filter(
+            Solution.name == name,
             *_published_public_filter(),
-            (
-                Solution.title.ilike(f"%{query}%")
-                | Solution.summary.ilike(f"%{query}%")
-                | Solution.description.ilike(f"%{query}%")
-            ),
         )
-        .all()
+        .one_or_none()
     )
-    return [serialize_public_solution(solution) for solution in results]
 
 
-def get_published_solution_by_hash(hash: str):
+def _find_preview_solution(hash: str, *options):
     solution = (
         db.session.query(Solution)
+        .options(*options)
         .filter(
             Solution.hash == hash,
         )
@@ -59,35 +317,131 @@ def get_published_solution_by_hash(hash: str):
     )
 
     if not solution:
-        return None
+        # archived revisions were unpublished, preview the published one
+        name = get_archived_revision_name(hash)
+        return _find_published_by_name(name, *options) if name else None
 
     # if solution is published and public, return it
     if (
         solution.status == SolutionStatus.PUBLISHED
         and solution.visibility == Visibility.PUBLIC
     ):
-        return serialize_public_solution(solution)
+        return solution
 
     # allow previewing pending solutions (for review dashboard)
     if solution.status in [
         SolutionStatus.PENDING_NAME_REVIEW,
         SolutionStatus.PENDING_METADATA_REVIEW,
     ]:
-        return serialize_public_solution(solution)
+        return solution
 
     # if solution is unpublished, try to find the latest published revision
     if solution.status == SolutionStatus.UNPUBLISHED:
-        latest_published = (
-            db.session.query(Solution)
-            .filter(
-                Solution.name == solution.name,
-                *_published_public_filter(),
-            )
-            .order_by(Solution.revision.desc())
-            .first()
-        )
+        latest_published = _find_published_by_name(solution.name, *options)
         if latest_published:
-            return serialize_public_solution(latest_published)
+            return latest_published
 
     # solution exists but is not published/public and no published version found
     return None
+
+
+def get_published_solution_by_hash(hash: str):
+    solution = _find_preview_solution(hash, *PUBLIC_SOLUTION_LOAD_OPTIONS)
+    return serialize_public_solution(solution) if solution else None
+
+
+# Validators for conditional GETs. These only read the columns needed to
+# build an ETag and Last-Modified header, so a request that turns into a
+# 304 never loads or serializes a solution.
+
+
+class CatalogVersion(NamedTuple):
+    count: int
+    last_updated: Optional[datetime]
+    # `CatalogState.serial`, also counting edits that change neither the
+    # count nor the last update, like a publisher or maintainer rename
+    serial: int = 0
+
+
+def get_published_catalog_version() -> CatalogVersion:
+    count, last_updated, serial = (
+        db.session.query(
+            func.count(Solution.id),
+            func.max(Solution.last_updated),
+            select(CatalogState.serial).scalar_subquery(),
+        )
+        .filter(*_published_public_filter())
+        .one()
+    )
+    return CatalogVersion(count, last_updated, serial or 0)
+
+
+def _linked_validators(publisher_id: str, maintainer_set_id) -> tuple:
+    """
+    Publisher and maintainer fields serialized with a solution, which are
+    edited without touching the solution itself.
+    """
+    publisher = (
+        db.session.query(Publisher.username, Publisher.display_name)
+        .filter(Publisher.publisher_id == publisher_id)
+        .one()
+    )
+    maintainers = (
+        db.session.query(Maintainer.display_name, Maintainer.email)
+        .join(
+            child_set_maintainer,
+            child_set_maintainer.c.maintainer_id == Maintainer.id,
+        )
+        .filter(child_set_maintainer.c.set_id == maintainer_set_id)
+        .order_by(Maintainer.id)
+        .all()
+    )
+    return (*publisher, *(value for row in maintainers for value in row))
+
+
+def get_published_solution_validators(name: str):
+    validators = (
+        db.session.query(
+            Solution.hash,
+            Solution.last_updated,
+            Solution.publisher_id,
+            Solution.maintainer_set_id,
+        )
+        .filter(
+            Solution.name == name,
+            *_published_public_filter(),
+        )
+        .one_or_none()
+    )
+    if validators is None:
+        return None
+    hash, last_updated, publisher_id, maintainer_set_id = validators
+    return (
+        hash,
+        last_updated,
+        *_linked_validators(publisher_id, maintainer_set_id),
+    )
+
+
+def get_preview_solution_validators(hash: str):
+    solution = _find_preview_solution(
+        hash,
+        load_only(
+            Solution.hash,
+            Solution.name,
+            Solution.status,
+            Solution.visibility,
+            Solution.last_updated,
+            Solution.publisher_id,
+            Solution.maintainer_set_id,
+        ),
+    )
+    if solution is None:
+        return None
+    return (
+        solution.hash,
+        solution.last_updated,
+        *_linked_validators(
+            solution.publisher_id, solution.maintainer_set_id
+        ),
+    )
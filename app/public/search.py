@@ -0,0 +1,454 @@
+import bisect
+import heapq
+import itertools
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from app.public.logic import (
+    decode_cursor,
+    encode_cursor,
+    get_all_published_solutions,
+    get_published_solution_by_name,
+    get_published_catalog_version,
+)
+
+# weight of a term occurrence in each indexed field
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "summary": 2.0,
+    "description": 1.0,
+    "use_cases": 1.0,
+    "charms": 2.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 25
+
+# values with the most matches returned per counted facet
+FACET_VALUES_LIMIT = 20
+
+# filterable facet -> values of a serialized solution for the facet
+FACETS = {
+    "platform": lambda s: [
+        deployable["platform"]
+        for deployable in s.get("deployable-on") or []
+        if deployable["platform"]
+    ],
+    "platform_version": lambda s: [
+        version
+        for deployable in s.get("deployable-on") or []
+        for version in deployable["version"]
+    ],
+    "juju_versions": lambda s: (s.get("compatibility") or {}).get(
+        "juju_versions", []
+    ),
+    "publisher": lambda s: (
+        [s["publisher"]["username"]] if s.get("publisher") else []
+    ),
+    "charm": lambda s: [
+        charm["charm_name"] for charm in s.get("charms") or []
+    ],
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower()) if text else []
+
+
+def _document_fields(solution: dict) -> dict:
+    return {
+        "title": solution.get("title"),
+        "summary": solution.get("summary"),
+        "description": solution.get("description"),
+        "use_cases": " ".join(
+            f"{use_case['title']} {use_case['description']}"
+            for use_case in solution.get("use_cases") or []
+        ),
+        "charms": " ".join(
+            charm["charm_name"] for charm in solution.get("charms") or []
+        ),
+    }
+
+
+def _suggestion_keys(solution: dict) -> tuple[set, set]:
+    """
+    Keys a suggestion prefix is matched against: the whole name and title,
+    then every later word of the title up to its end.
+    """
+    title = (solution.get("title") or "").lower()
+    words = [match.start() for match in re.finditer(r"\w+", title)]
+    return (
+        {solution["name"].lower(), title} - {""},
+        {title[start:] for start in words[1:]},
+    )
+
+
+def tokenize_document(solution: dict) -> set[str]:
+    return {
+        token
+        for text in _document_fields(solution).values()
+        for token in tokenize(text)
+    }
+
+
+class SearchIndex:
+    """
+    In-process inverted index over the serialized published public
+    solutions, answering `/api/solutions/search` and filtered listings of
+    `/api/solutions` without a database round trip.
+
+    Documents are keyed by solution name, as only one revision of a name is
+    published at a time. Each term maps to the field-weighted frequency of
+    the term in every document containing it, and query terms match every
+    indexed term they are a prefix of. Matches are ranked with BM25.
+
+    Suggestions for a typed prefix come from sorted arrays of lowercased
+    names and titles, bisected to the first key with the prefix.
+
+    Each document also owns one bit, and every value of a facet (see
+    `FACETS`) maps to the bitset of the documents having it, so filters and
+    facet counts are a few integer AND/OR operations and popcounts. A facet
+    with more values than matching documents is counted from the documents
+    instead, so counting costs at most one step per match.
+
+    The index is built on first use and tagged with the catalog version it
+    reflects. Commits in this worker refresh the changed solution in place
+    (see `published_solution_changed`), a different catalog version means
+    another writer changed the catalog and the index is rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._clear()
+
+    def _clear(self):
+        self._documents = {}
+        self._names = []
+        self._lengths = {}
+        self._postings = defaultdict(dict)
+        self._terms = []
+        self._total_length = 0.0
+        self._slots = {}
+        self._slot_names = {}
+        self._free_slots = []
+        self._all_bits = 0
+        self._facets = {facet: {} for facet in FACETS}
+        # (key, name) of whole names and titles, then of title words
+        self._suggestions = ([], [])
+
+    def rebuild(self, solutions, version):
+        with self._lock:
+            self._clear()
+            for solution in solutions:
+                self._add(solution)
+            self._version = version
+
+    def refresh(self, name: str, shared_changed: bool = False):
+        """
+        Re-index the published revision of one solution after a commit, if
+        built. The index is only tagged with the new catalog version when
+        that commit was the only change since the version it reflects and
+        did not edit a publisher or maintainer (`shared_changed`) other
+        documents may include, otherwise it stays stale and the next lookup
+        rebuilds it.
+        """
+        with self._lock:
+            if self._version is None:
+                return
+            solution = get_published_solution_by_name(name)
+            self._remove(name)
+            if solution:
+                self._add(solution)
+            if shared_changed:
+                return
+            version = get_published_catalog_version()
+            if version.serial == self._version.serial + 1:
+                self._version = version
+
+    def search(self, query: str, version) -> list[dict]:
+        if not tokenize(query):
+            return []
+
+        with self._lock:
+            self._ensure_version(version)
+            return [solution for _, solution in self._ranked(query)]
+
+    def suggest(self, prefix: str, version, limit: int) -> list[dict]:
+        """
+        Return the name and title of up to `limit` solutions with a name or
+        title starting with `prefix`, then with a title word starting with
+        it, alphabetically within each group.
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+
+        names = {}
+        with self._lock:
+            self._ensure_version(version)
+            for keys in self._suggestions:
+                start = bisect.bisect_left(keys, (prefix,))
+                for key, name in itertools.islice(keys, start, None):
+                    if len(names) == limit or not key.startswith(prefix):
+                        break
+                    names.setdefault(name, self._documents[name])
+
+        return [
+            {"name": solution["name"], "title": solution["title"]}
+            for solution in names.values()
+        ]
+
+    def solutions_with_charm(self, charm_name: str, version) -> list[dict]:
+        """Published solutions including `charm_name`, ordered by name."""
+        with self._lock:
+            self._ensure_version(version)
+            bits = self._facets["charm"].get(charm_name, 0)
+            return [
+                self._documents[name]
+                for name in self._names
+                if bits >> self._slots[name] & 1
+            ]
+
+    def search_page(
+        self,
+        query: str,
+        version,
+        limit: int,
+        after=None,
+        filters=None,
+        facets=None,
+    ):
+        """
+        Page through the matches of `query` by relevance, or through the
+        whole catalog by name without one, keeping only the solutions
+        matching `filters` (facet -> accepted values). Values of one facet
+        are alternatives, distinct facets must all match.
+
+        The `facets` of the result count the solutions having each value of
+        the requested `facets` (all by default), applying every filter but
+        the one on the counted facet, so a client can show how picking
+        another value changes the results. Each facet lists its
+        `FACET_VALUES_LIMIT` values with the most solutions.
+        """
+        filters = filters or {}
+        if query is not None and not tokenize(query):
+            return {"solutions": [], "next": None, "total": 0, "facets": {}}
+
+        with self._lock:
+            self._ensure_version(version)
+
+            if query is None:
+                key_types = (str, int)
+                documents = (self._documents[name] for name in self._names)
+                matches = [
+                    ((solution["name"], solution["id"]), solution)
+                    for solution in documents
+                ]
+                matched_bits = self._all_bits
+            else:
+                key_types = ((int, float), str, int)
+                matches = self._ranked(query)
+                matched_bits = 0
+                for _, solution in matches:
+                    matched_bits |= 1 << self._slots[solution["name"]]
+
+            facets = self._facet_counts(
+                matched_bits, filters, FACETS if facets is None else facets
+            )
+            if any(filters.values()):
+                selected = matched_bits & self._filter_bits(filters)
+                matches = [
+                    match
+                    for match in matches
+                    if selected >> self._slots[match[1]["name"]] & 1
+                ]
+
+        total = len(matches)
+        if after:
+            key = tuple(decode_cursor(after, *key_types))
+            matches = [match for match in matches if match[0] > key]
+
+        page = matches[:limit]
+        has_next = len(matches) > limit
+        return {
+            "solutions": [solution for _, solution in page],
+            "next": encode_cursor(*page[-1][0]) if has_next else None,
+            "total": total,
+            "facets": facets,
+        }
+
+    def _ensure_version(self, version):
+        if version != self._version:
+            self.rebuild(get_all_published_solutions(), version)
+
+    def _ranked(self, query: str) -> list[tuple]:
+        scores = None
+        for term in dict.fromkeys(tokenize(query)):
+            term_scores = self._score_prefix(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    name: score + term_scores[name]
+                    for name, score in scores.items()
+                    if name in term_scores
+                }
+            if not scores:
+                return []
+
+        matches = []
+        for name, score in scores.items():
+            solution = self._documents[name]
+            matches.append(((-score, name, solution["id"]), solution))
+
+        return sorted(matches, key=lambda match: match[0])
+
+    def _score_prefix(self, prefix: str) -> dict:
+        """BM25 scores of the documents containing a term with `prefix`."""
+        scores = defaultdict(float)
+        count = len(self._documents)
+        average_length = self._total_length / count if count else 0.0
+
+        start = bisect.bisect_left(self._terms, prefix)
+        for term in itertools.islice(self._terms, start, None):
+            if not term.startswith(prefix):
+                break
+            postings = self._postings[term]
+            idf = math.log(
+                1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for name, frequency in postings.items():
+                norm = 1 - BM25_B + BM25_B * self._lengths[name] / (
+                    average_length or 1.0
+                )
+                scores[name] += idf * (
+                    frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                )
+
+        return scores
+
+    def _filter_bits(self, filters: dict, exclude: str = None) -> int:
+        """Bitset of the documents matching every filter but `exclude`."""
+        bits = self._all_bits
+        for facet, values in filters.items():
+            if facet == exclude or not values:
+                continue
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self._facets[facet].get(value, 0)
+            bits &= facet_bits
+        return bits
+
+    def _facet_counts(self, matched_bits: int, filters: dict, facets):
+        counts = {}
+        for facet in facets:
+            values = self._facets[facet]
+            bits = matched_bits & self._filter_bits(filters, exclude=facet)
+            if bits.bit_count() < len(values):
+                value_counts = Counter(
+                    value
+                    for slot in self._bit_slots(bits)
+                    for value in set(
+                        FACETS[facet](self._documents[self._slot_names[slot]])
+                    )
+                )
+            else:
+                value_counts = {
+                    value: (value_bits & bits).bit_count()
+                    for value, value_bits in values.items()
+                }
+            top = heapq.nsmallest(
+                FACET_VALUES_LIMIT,
+                ((-count, value) for value, count in value_counts.items()),
+            )
+            counts[facet] = {value: -count for count, value in top if count}
+        return counts
+
+    @staticmethod
+    def _bit_slots(bits: int):
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def _add(self, solution: dict):
+        name = solution["name"]
+        frequencies = Counter()
+        length = 0
+
+        for field, text in _document_fields(solution).items():
+            tokens = tokenize(text)
+            length += len(tokens)
+            for token in tokens:
+                frequencies[token] += FIELD_WEIGHTS[field]
+
+        for term, frequency in frequencies.items():
+            if term not in self._postings:
+                bisect.insort(self._terms, term)
+            self._postings[term][name] = frequency
+
+        slot = self._free_slots.pop() if self._free_slots else len(self._slots)
+        bit = 1 << slot
+        for facet, values in FACETS.items():
+            facet_values = self._facets[facet]
+            for value in values(solution):
+                facet_values[value] = facet_values.get(value, 0) | bit
+
+        for keys, entries in zip(
+            _suggestion_keys(solution), self._suggestions
+        ):
+            for key in keys:
+                bisect.insort(entries, (key, name))
+
+        self._slots[name] = slot
+        self._slot_names[slot] = name
+        self._all_bits |= bit
+        self._documents[name] = solution
+        bisect.insort(self._names, name)
+        self._lengths[name] = length
+        self._total_length += length
+
+    def _remove(self, name: str):
+        if name not in self._documents:
+            return
+
+        solution = self._documents.pop(name)
+        for term in tokenize_document(solution):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(name, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+        slot = self._slots.pop(name)
+        del self._slot_names[slot]
+        bit = 1 << slot
+        for facet, values in FACETS.items():
+            facet_values = self._facets[facet]
+            for value in values(solution):
+                remaining = facet_values.get(value, 0) & ~bit
+                if remaining:
+                    facet_values[value] = remaining
+                else:
+                    facet_values.pop(value, None)
+
+        for keys, entries in zip(
+            _suggestion_keys(solution), self._suggestions
+        ):
+            for key in keys:
+                del entries[bisect.bisect_left(entries, (key, name))]
+
+        self._all_bits &= ~bit
+        self._free_slots.append(slot)
+        del self._names[bisect.bisect_left(self._names, name)]
+        self._total_length -= self._lengths.pop(name)
+
+
+search_index = SearchIndex()
@@ -1,10 +1,12 @@
 from canonicalwebteam.store_api.devicegw import DeviceGW
 import logging
+from app.cache import ttl_cache
 from app.exceptions import ValidationError
 
 device_gateway = DeviceGW("charm")
 
 
+@ttl_cache("store-publisher-details", ttl=3600, shared=True, negative_ttl=30)
 def get_publisher_details(publisher_username):
     """
     Get publisher details from device gateway
@@ -45,6 +47,7 @@ def get_publisher_details(publisher_username):
         )
 
 
+@ttl_cache("store-user-details", ttl=3600, shared=True)
 def get_user_details_by_email(email):
     try:
         username_candidate = email.split("@")[0]
@@ -9,22 +9,31 @@ from app.publisher.logic import (
     find_or_create_creator,
 )
 from app.public.logic import get_published_solution_by_name
+from app.archive import get_archived_revision
 from app.public.auth import login_required
+from app.replica import read_replica
 from app.public.launchpad import get_user_teams
 from app.exceptions import ValidationError
+from app.utils import parse_fields
 
 publisher_bp = Blueprint("publisher", __name__)
 
 
 @publisher_bp.route("/solutions", methods=["GET"])
 @login_required
+@read_replica
 def get_publisher_solutions():
     user = g.user
     teams = g.user["teams"]
     if not teams:
         teams = get_user_teams(user["username"])
 
-    solutions = get_solutions_by_lp_teams(teams)
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
+
+    solutions = get_solutions_by_lp_teams(teams, fields=fields)
     return jsonify(solutions), 200
 
 
@@ -76,8 +85,17 @@ def register_solution():
 
 @publisher_bp.route("/solutions/<string:name>/<int:rev>", methods=["GET"])
 @login_required
+@read_replica
 def get_solution_revision(name, rev):
     solution = get_solution_by_name_and_rev(name, rev)
+    if not solution:
+        archived = get_archived_revision(name, rev) or {}
+        # the archive also keeps reviewer emails and comments
+        solution = {
+            key: value
+            for key, value in archived.items()
+            if key != "review_actions"
+        }
 
     if not solution:
         return jsonify({"error": "Solution revision not found"}), 404
@@ -123,10 +141,13 @@ def create_solution_revision(name):
         data.get("mattermost_handle"),
     )
 
-    solution = create_new_solution_revision(
-        name=name,
-        creator=creator,
-    )
+    try:
+        solution = create_new_solution_revision(
+            name=name,
+            creator=creator,
+        )
+    except ValidationError as e:
+        return jsonify({"error-list": e.errors}), 400
 
     return jsonify(solution), 200
 
@@ -6,12 +6,24 @@ from app.models import (
     SolutionStatus,
     Creator,
     Visibility,
-    Charm,
-    UsefulLink,
-    UseCase,
     Maintainer,
 )
-from app.utils import serialize_solution
+from app.child_sets import (
+    CHARMS,
+    SET_COLUMNS,
+    USE_CASES,
+    USEFUL_LINKS,
+    item_set_id,
+    maintainer_set_id,
+    stored_items,
+    submitted_items,
+)
+from app.utils import (
+    SOLUTION_LOAD_OPTIONS,
+    serialize_solution,
+    solution_load_options,
+)
+from app.public.catalog import published_solution_changed
 from app.public.store_api import (
     get_publisher_details,
     get_user_details_by_email,
@@ -19,7 +31,8 @@ from app.public.store_api import (
 from app.exceptions import ValidationError
 import uuid
 import re
-from sqlalchemy import inspect
+from sqlalchemy import insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 
 
@@ -213,6 +226,7 @@ def register_solution_package(
 def get_solution_by_name(name: str):
     solution = (
         db.session.query(Solution)
+        .options(*SOLUTION_LOAD_OPTIONS)
         .filter(
             Solution.name == name,
         )
@@ -221,12 +235,13 @@ def get_solution_by_name(name: str):
     return serialize_solution(solution) if solution else None
 
 
-def get_solutions_by_lp_teams(teams: list[str]):
+def get_solutions_by_lp_teams(teams: list[str], fields=None):
     if not teams:
         return []
 
     solutions = (
         db.session.query(Solution)
+        .options(*solution_load_options(fields))
         .join(Publisher, Solution.publisher_id == Publisher.publisher_id)
         .filter(
             Publisher.username.in_(teams),
@@ -235,7 +250,9 @@ def get_solutions_by_lp_teams(teams: list[str]):
         .all()
     )
 
-    return [serialize_solution(solution) for solution in solutions]
+    return [
+        serialize_solution(solution, fields=fields) for solution in solutions
+    ]
 
 
 def create_empty_solution(
@@ -308,30 +325,34 @@ def create_new_solution_revision(
             Solution.name == name,
             Solution.status == SolutionStatus.PUBLISHED,
         )
-        .first()
+        .one_or_none()
     )
 
     if not current_solution:
         return None
 
     try:
-
-        mapper = inspect(Solution)
-        data = {}
-        for column in mapper.columns:
-            if column.key not in ["id"]:
-                data[column.key] = getattr(current_solution, column.key)
-
-        data["hash"] = uuid.uuid4().hex[:16]
-        data["revision"] = current_solution.revision + 1
-        data["status"] = SolutionStatus.DRAFT
-        data["creator_id"] = creator.id  # Set the new creator for this revision
-
-        new_solution = Solution(**data)
-        db.session.add(new_solution)
+        new_solution = clone_solution_revision(
+            current_solution,
+            hash=uuid.uuid4().hex[:16],
+            revision=current_solution.revision + 1,
+            status=SolutionStatus.DRAFT,
+            creator_id=creator.id,  # Set the new creator for this revision
+        )
         db.session.commit()
         return serialize_solution(new_solution)
 
+    except IntegrityError:
+        # another request created the draft of this solution first
+        db.session.rollback()
+        raise ValidationError(
+            [
+                {
+                    "code": "draft-exists",
+                    "message": "Draft already exists",
+                }
+            ]
+        )
     except Exception:
         db.session.rollback()
         raise
@@ -340,6 +361,7 @@ def create_new_solution_revision(
 def get_draft_solution_by_name(name: str):
     solution = (
         db.session.query(Solution)
+        .options(*SOLUTION_LOAD_OPTIONS)
         .filter(
             Solution.name == name,
             Solution.status == SolutionStatus.DRAFT,
@@ -352,6 +374,7 @@ def get_draft_solution_by_name(name: str):
 def get_solution_by_name_and_rev(name: str, rev: int):
     solution = (
         db.session.query(Solution)
+        .options(*SOLUTION_LOAD_OPTIONS)
         .filter(
             Solution.name == name,
             Solution.revision == rev,
@@ -361,81 +384,53 @@ def get_solution_by_name_and_rev(name: str, rev: int):
     return serialize_solution(solution) if solution else None
 
 
-def copy_charms_to_solution(
-    source_solution, target_solution_id, new_charms_data=None
-):
-    if new_charms_data is not None:
-        for charm_name in new_charms_data:
-            if charm_name and charm_name.strip():
-                charm = Charm(
-                    charm_name=charm_name.strip(),
-                    solution_id=target_solution_id,
-                )
-                db.session.add(charm)
-    else:
-        for old_charm in source_solution.charms:
-            charm = Charm(
-                charm_name=old_charm.charm_name, solution_id=target_solution_id
-            )
-            db.session.add(charm)
-
-
-def copy_useful_links_to_solution(
-    source_solution, target_solution_id, new_links_data=None
+def update_child_sets(
+    solution,
+    charms=None,
+    useful_links=None,
+    use_cases=None,
+    maintainers=None,
 ):
-    if new_links_data is not None:
-        for link_data in new_links_data:
-            if link_data.get("title") and link_data.get("url"):
-                useful_link = UsefulLink(
-                    title=link_data["title"].strip(),
-                    url=link_data["url"].strip(),
-                    solution_id=target_solution_id,
-                )
-                db.session.add(useful_link)
-    else:
-        for old_link in source_solution.useful_links:
-            useful_link = UsefulLink(
-                title=old_link.title,
-                url=old_link.url,
-                solution_id=target_solution_id,
-            )
-            db.session.add(useful_link)
-
+    """
+    Point the solution at the child sets holding the given collections.
+    Collections left as None, or submitted unchanged, keep the sets the
+    solution references, which for a new revision are the sets of its
+    parent, without any write or Store API lookup.
+    """
+    changed = []
 
-def copy_use_cases_to_solution(
-    source_solution, target_solution_id, new_cases_data=None
-):
-    if new_cases_data is not None:
-        for case_data in new_cases_data:
-            if case_data.get("title") and case_data.get("description"):
-                use_case = UseCase(
-                    title=case_data["title"].strip(),
-                    description=case_data["description"].strip(),
-                    solution_id=target_solution_id,
-                )
-                db.session.add(use_case)
-    else:
-        for old_case in source_solution.use_cases:
-            use_case = UseCase(
-                title=old_case.title,
-                description=old_case.description,
-                solution_id=target_solution_id,
+    for kind, submitted in (
+        (CHARMS, charms),
+        (USEFUL_LINKS, useful_links),
+        (USE_CASES, use_cases),
+    ):
+        if submitted is None:
+            continue
+        items = submitted_items(kind, submitted)
+        # the kinds are named after the collections of the solution
+        if items != stored_items(kind, getattr(solution, kind)):
+            setattr(solution, SET_COLUMNS[kind], item_set_id(kind, items))
+            changed.append(kind)
+
+    if maintainers is not None:
+        emails = {
+            email.strip() for email in maintainers if email and email.strip()
+        }
+        current = {
+            maintainer.email: maintainer
+            for maintainer in solution.maintainers
+        }
+        if emails != current.keys():
+            # only the added maintainers are looked up
+            solution.maintainer_set_id = maintainer_set_id(
+                current.get(email) or find_or_create_maintainer(email)
+                for email in sorted(emails)
             )
-            db.session.add(use_case)
+            changed.append("maintainers")
 
-
-def copy_maintainers_to_solution(
-    source_solution, target_solution, new_maintainers_data=None
-):
-    if new_maintainers_data is not None:
-        for email in new_maintainers_data:
-            if email and email.strip():
-                maintainer = find_or_create_maintainer(email.strip())
-                if maintainer not in target_solution.maintainers:
-                    target_solution.maintainers.append(maintainer)
-    else:
-        for old_maintainer in source_solution.maintainers:
-            target_solution.maintainers.append(old_maintainer)
+    if changed:
+        # the collections are read through the set ids
+        db.session.expire(solution, changed)
 
 
 def update_solution_creator(
@@ -463,43 +458,62 @@ def update_solution_creator(
             )
 
 
-def create_solution_revision(original_solution, metadata):
-    mapper = inspect(Solution)
-    data = {}
-    for column in mapper.columns:
-        if column.key not in ["id"]:
-            data[column.key] = getattr(original_solution, column.key)
-
-    for field, value in metadata.items():
-        if field in EDITABLE_FIELDS:
-            data[field] = value
+def clone_solution_revision(source_solution, **values):
+    """
+    Copy the row of `source_solution` into a new revision with a single
+    INSERT ... SELECT, replacing the columns given in `values`. The new
+    revision references the child sets of its source, so no child row is
+    copied.
+    """
+    columns = [
+        column for column in Solution.__table__.columns if column.key != "id"
+    ]
+    statement = (
+        insert(Solution)
+        .from_select(
+            [column.key for column in columns],
+            select(
+                *(
+                    (
+                        literal(values[column.key], column.type)
+                        if column.key in values
+                        else column
+                    )
+                    for column in columns
+                )
+            ).where(Solution.id == source_solution.id),
+        )
+        .returning(Solution)
+    )
+    return db.session.scalars(statement).one()
 
-    data["hash"] = uuid.uuid4().hex[:16]
-    data["revision"] = original_solution.revision + 1
-    data["status"] = SolutionStatus.PUBLISHED
-    data["last_updated"] = datetime.now(timezone.utc)
 
+def create_solution_revision(original_solution, metadata):
     original_solution.status = SolutionStatus.UNPUBLISHED
 
-    new_solution = Solution(**data)
-    db.session.add(new_solution)
-    db.session.flush()
-
-    return new_solution
+    return clone_solution_revision(
+        original_solution,
+        **{
+            field: value
+            for field, value in metadata.items()
+            if field in EDITABLE_FIELDS
+        },
+        hash=uuid.uuid4().hex[:16],
+        revision=original_solution.revision + 1,
+        status=SolutionStatus.PUBLISHED,
+        last_updated=datetime.now(timezone.utc),
+    )
 
 
 def update_published_solution(solution, metadata):
     new_solution = create_solution_revision(solution, metadata)
 
-    copy_charms_to_solution(solution, new_solution.id, metadata.get("charms"))
-    copy_useful_links_to_solution(
-        solution, new_solution.id, metadata.get("useful_links")
-    )
-    copy_use_cases_to_solution(
-        solution, new_solution.id, metadata.get("use_cases")
-    )
-    copy_maintainers_to_solution(
-        solution, new_solution, metadata.get("maintainers")
+    update_child_sets(
+        new_solution,
+        charms=metadata.get("charms"),
+        useful_links=metadata.get("useful_links"),
+        use_cases=metadata.get("use_cases"),
+        maintainers=metadata.get("maintainers"),
     )
 
     update_solution_creator(
@@ -508,8 +522,8 @@ def update_published_solution(solution, metadata):
         metadata.get("mattermost_handle"),
     )
 
-    db.session.flush()
     db.session.commit()
+    published_solution_changed(new_solution.name)
     return serialize_solution(new_solution)
 
 
@@ -525,27 +539,13 @@ def update_draft_solution(solution, metadata):
         if field in EDITABLE_FIELDS:
             setattr(solution, field, value)
 
-    if charms_data is not None:
-        db.session.query(Charm).filter(
-            Charm.solution_id == solution.id
-        ).delete()
-        copy_charms_to_solution(None, solution.id, charms_data)
-
-    if useful_links_data is not None:
-        db.session.query(UsefulLink).filter(
-            UsefulLink.solution_id == solution.id
-        ).delete()
-        copy_useful_links_to_solution(None, solution.id, useful_links_data)
-
-    if use_cases_data is not None:
-        db.session.query(UseCase).filter(
-            UseCase.solution_id == solution.id
-        ).delete()
-        copy_use_cases_to_solution(None, solution.id, use_cases_data)
-
-    if maintainers_data is not None:
-        solution.maintainers.clear()
-        copy_maintainers_to_solution(None, solution, maintainers_data)
+    update_child_sets(
+        solution,
+        charms=charms_data,
+        useful_links=useful_links_data,
+        use_cases=use_cases_data,
+        maintainers=maintainers_data,
+    )
 
     update_solution_creator(
         solution, creator_email, mattermost_handle
@@ -554,11 +554,17 @@ def update_draft_solution(solution, metadata):
     if solution.revision == 1:
         solution.status = SolutionStatus.PENDING_METADATA_REVIEW
     else:
+        db.session.query(Solution).filter(
+            Solution.name == solution.name,
+            Solution.status == SolutionStatus.PUBLISHED,
+        ).update({"status": SolutionStatus.UNPUBLISHED})
         solution.status = SolutionStatus.PUBLISHED
 
     solution.last_updated = datetime.now(timezone.utc)
 
     db.session.commit()
+    if solution.status == SolutionStatus.PUBLISHED:
+        published_solution_changed(solution.name)
     return serialize_solution(solution)
 
 
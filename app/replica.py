@@ -0,0 +1,49 @@
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# key of the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = "replica"
+
+
+class RoutingSession(Session):
+    """
+    Session sending the queries of `read_replica` routes to the read
+    replica bind, when one is configured. Flushes, and every query after
+    the session wrote something, stay on the primary so a request always
+    reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica():
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(
+            mapper=mapper, clause=clause, bind=bind, **kwargs
+        )
+
+    def _use_replica(self) -> bool:
+        return (
+            has_app_context()
+            and g.get("use_read_replica", False)
+            and not self._flushing
+            and not self.info.get("wrote")
+            and REPLICA_BIND in self._db.engines
+        )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+
+def read_replica(view):
+    """Serve the queries of a read-only view from the read replica."""
+
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        g.use_read_replica = True
+        return view(*args, **kwargs)
+
+    return decorated
@@ -8,6 +8,7 @@ from app.models import (
     Visibility,
 )
 from app.utils import serialize_solution
+from app.public.catalog import published_solution_changed
 
 
 def approve_solution_name(name: str, reviewer_id: str):
@@ -36,14 +37,15 @@ def approve_solution_name(name: str, reviewer_id: str):
 
 
 def approve_solution_metadata(name: str, reviewer_id: str):
+    # only first revisions go through metadata review, so there is at most
+    # one pending revision per name
     solution = (
         db.session.query(Solution)
         .filter(
             Solution.name == name,
             Solution.status == SolutionStatus.PENDING_METADATA_REVIEW,
         )
-        .order_by(Solution.revision.desc())
-        .first()
+        .one_or_none()
     )
     if solution:
         # Unpublish previous revision
@@ -67,5 +69,6 @@ def approve_solution_metadata(name: str, reviewer_id: str):
         )
         db.session.add(review_action)
         db.session.commit()
+        published_solution_changed(name)
         return serialize_solution(solution)
     return None
@@ -1,70 +1,217 @@
+import hashlib
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from app.exceptions import ValidationError
 from app.models import Solution
 
 
-def serialize_solution(
-    solution: Solution, include_private: bool = True
-) -> dict:
-    data = {
-        "id": solution.id,
-        "name": solution.name,
-        "hash": solution.hash,
-        "revision": solution.revision,
-        "status": solution.status.value,
-        "visibility": solution.visibility.value,
-        "title": solution.title,
-        "summary": solution.summary,
-        "description": solution.description,
-        "terraform_modules": solution.terraform_modules,
-        "created": solution.created.isoformat(),
-        "last_updated": solution.last_updated.isoformat(),
-        "publisher": {
-            "id": solution.publisher.publisher_id,
-            "display_name": solution.publisher.display_name,
-            "username": solution.publisher.username,
-        },
-        "use_cases": [uc.to_dict() for uc in solution.use_cases],
-        "deployable-on": [
-            {
-                "platform": (
-                    solution.platform.value if solution.platform else None
-                ),
-                "version": solution.platform_version or [],
-                "prerequisites": solution.platform_prerequisites or [],
-            }
-        ],
-        "compatibility": {
-            "juju_versions": solution.juju_versions or [],
-        },
-        "documentation": {
-            "main": solution.documentation_main,
-            "source": solution.documentation_source,
-            "get_started": solution.get_started_url,
-            "architecture_explanation": solution.architecture_explanation,
-            "submit_a_bug": solution.submit_bug_url,
-            "community_discussion": solution.community_discussion_url,
-        },
-        "media": {
-            "icon": solution.icon,
-            "architecture_diagram": solution.architecture_diagram_url,
-        },
-        "charms": [c.to_dict() for c in solution.charms],
-        "maintainers": [m.to_dict() for m in solution.maintainers],
-        "useful_links": [ul.to_dict() for ul in solution.useful_links],
+class SolutionField(NamedTuple):
+    # builds the value of one top-level key of a serialized solution
+    serialize: Callable[[Solution], object]
+    # columns read by `serialize`
+    columns: tuple = ()
+    # eager loader for the relationship read by `serialize`, if any
+    loader: Optional[object] = None
+
+
+def _serialize_publisher(solution: Solution) -> dict:
+    return {
+        "id": solution.publisher.publisher_id,
+        "display_name": solution.publisher.display_name,
+        "username": solution.publisher.username,
+    }
+
+
+def _serialize_deployable_on(solution: Solution) -> list:
+    return [
+        {
+            "platform": (
+                solution.platform.value if solution.platform else None
+            ),
+            "version": solution.platform_version or [],
+            "prerequisites": solution.platform_prerequisites or [],
+        }
+    ]
+
+
+def _serialize_documentation(solution: Solution) -> dict:
+    return {
+        "main": solution.documentation_main,
+        "source": solution.documentation_source,
+        "get_started": solution.get_started_url,
+        "architecture_explanation": solution.architecture_explanation,
+        "submit_a_bug": solution.submit_bug_url,
+        "community_discussion": solution.community_discussion_url,
     }
 
+
+def _serialize_creator(solution: Solution) -> Optional[dict]:
+    return (
+        {
+            "email": solution.creator.email,
+            "mattermost_handle": solution.creator.mattermost_handle,
+        }
+        if solution.creator
+        else None
+    )
+
+
+PUBLIC_SOLUTION_FIELDS = {
+    "id": SolutionField(lambda s: s.id),
+    "name": SolutionField(lambda s: s.name, (Solution.name,)),
+    "hash": SolutionField(lambda s: s.hash, (Solution.hash,)),
+    "revision": SolutionField(lambda s: s.revision, (Solution.revision,)),
+    "status": SolutionField(lambda s: s.status.value, (Solution.status,)),
+    "visibility": SolutionField(
+        lambda s: s.visibility.value, (Solution.visibility,)
+    ),
+    "title": SolutionField(lambda s: s.title, (Solution.title,)),
+    "summary": SolutionField(lambda s: s.summary, (Solution.summary,)),
+    "description": SolutionField(
+        lambda s: s.description, (Solution.description,)
+    ),
+    "terraform_modules": SolutionField(
+        lambda s: s.terraform_modules, (Solution.terraform_modules,)
+    ),
+    "created": SolutionField(
+        lambda s: s.created.isoformat(), (Solution.created,)
+    ),
+    "last_updated": SolutionField(
+        lambda s: s.last_updated.isoformat(), (Solution.last_updated,)
+    ),
+    "publisher": SolutionField(
+        _serialize_publisher,
+        (Solution.publisher_id,),
+        joinedload(Solution.publisher),
+    ),
+    "use_cases": SolutionField(
+        lambda s: [uc.to_dict() for uc in s.use_cases],
+        loader=selectinload(Solution.use_cases),
+    ),
+    "deployable-on": SolutionField(
+        _serialize_deployable_on,
+        (
+            Solution.platform,
+            Solution.platform_version,
+            Solution.platform_prerequisites,
+        ),
+    ),
+    "compatibility": SolutionField(
+        lambda s: {"juju_versions": s.juju_versions or []},
+        (Solution.juju_versions,),
+    ),
+    "documentation": SolutionField(
+        _serialize_documentation,
+        (
+            Solution.documentation_main,
+            Solution.documentation_source,
+            Solution.get_started_url,
+            Solution.architecture_explanation,
+            Solution.submit_bug_url,
+            Solution.community_discussion_url,
+        ),
+    ),
+    "media": SolutionField(
+        lambda s: {
+            "icon": s.icon,
+            "architecture_diagram": s.architecture_diagram_url,
+        },
+        (Solution.icon, Solution.architecture_diagram_url),
+    ),
+    "charms": SolutionField(
+        lambda s: [c.to_dict() for c in s.charms],
+        loader=selectinload(Solution.charms),
+    ),
+    "maintainers": SolutionField(
+        lambda s: [m.to_dict() for m in s.maintainers],
+        loader=selectinload(Solution.maintainers),
+    ),
+    "useful_links": SolutionField(
+        lambda s: [ul.to_dict() for ul in s.useful_links],
+        loader=selectinload(Solution.useful_links),
+    ),
+}
+
+PRIVATE_SOLUTION_FIELDS = {
+    "creator": SolutionField(
+        _serialize_creator,
+        (Solution.creator_id,),
+        joinedload(Solution.creator),
+    ),
+    "approved_by": SolutionField(
+        lambda s: s.approved_by, (Solution.approved_by,)
+    ),
+}
+
+
+def _solution_fields(include_private: bool) -> dict:
     if include_private:
-        data["creator"] = (
-            {
-                "email": solution.creator.email,
-                "mattermost_handle": solution.creator.mattermost_handle,
-            }
-            if solution.creator
-            else None
+        return {**PUBLIC_SOLUTION_FIELDS, **PRIVATE_SOLUTION_FIELDS}
+    return PUBLIC_SOLUTION_FIELDS
+
+
+def parse_fields(value: Optional[str], include_private: bool = True):
+    """
+    Parse a comma separated `fields=` query parameter into a tuple of
+    top-level solution keys, or None when every key is wanted.
+    """
+    if not value:
+        return None
+
+    names = (field.strip() for field in value.split(","))
+    fields = tuple(dict.fromkeys(name for name in names if name))
+    unknown = set(fields) - set(_solution_fields(include_private))
+    if unknown or not fields:
+        raise ValidationError(
+            [
+                {
+                    "code": "invalid-fields",
+                    "message": "Unknown fields: "
+                    f"{', '.join(sorted(unknown or [value]))}.",
+                }
+            ]
         )
-        data["approved_by"] = solution.approved_by
+    return fields
+
+
+def solution_load_options(fields=None, include_private: bool = True):
+    """
+    Loader options for serializing solutions with the given fields.
+
+    Every relationship read by the serializer is eager loaded, so
+    serializing a list of N solutions costs a fixed number of queries
+    instead of one lazy load per relationship per solution. With a sparse
+    fieldset, only the columns and relationships it needs are loaded.
+    """
+    solution_fields = _solution_fields(include_private)
+    selected = [solution_fields[field] for field in fields or solution_fields]
+
+    options = [field.loader for field in selected if field.loader]
+    if fields:
+        columns = {column for field in selected for column in field.columns}
+        options.append(load_only(Solution.id, *columns))
+    return tuple(options)
+
+
+PUBLIC_SOLUTION_LOAD_OPTIONS = solution_load_options(include_private=False)
+SOLUTION_LOAD_OPTIONS = solution_load_options()
+
+
+def serialize_solution(
+    solution: Solution, include_private: bool = True, fields=None
+) -> dict:
+    solution_fields = _solution_fields(include_private)
+    return {
+        field: solution_fields[field].serialize(solution)
+        for field in fields or solution_fields
+    }
+
 
-    return data
+def serialize_public_solution(solution: Solution, fields=None) -> dict:
+    return serialize_solution(solution, include_private=False, fields=fields)
 
 
-def serialize_public_solution(solution: Solution) -> dict:
-    return serialize_solution(solution, include_private=False)
+def make_etag(*parts) -> str:
+    """Build a strong ETag value from the given validator parts."""
+    message = "|".join(str(part) for part in parts).encode()
+    return hashlib.blake2b(message, digest_size=16).hexdigest()
@@ -5,11 +5,60 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, ".env"))
 
 
+def engine_options(database_uri):
+    """
+    SQLAlchemy engine options of the database, from the environment.
+    Pool sizing only applies to PostgreSQL, SQLite uses its default pools.
+    """
+    options = {
+        "pool_pre_ping": os.getenv("FLASK_DB_POOL_PRE_PING", "true").lower()
+        == "true",
+    }
+    if not database_uri.startswith("postgresql"):
+        return options
+
+    options.update(
+        pool_size=int(os.getenv("FLASK_DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("FLASK_DB_POOL_MAX_OVERFLOW", "10")),
+        # seconds to wait for a connection before failing the request
+        pool_timeout=int(os.getenv("FLASK_DB_POOL_TIMEOUT", "10")),
+        # seconds after which a connection is replaced, before the server
+        # or a proxy drops it
+        pool_recycle=int(os.getenv("FLASK_DB_POOL_RECYCLE", "1800")),
+    )
+    statement_timeout = int(os.getenv("FLASK_DB_STATEMENT_TIMEOUT_MS", "0"))
+    if statement_timeout:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "POSTGRESQL_DB_CONNECT_STRING", "sqlite:///solutions.db"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # optional read replica serving the read-only API routes
+    REPLICA_DATABASE_URI = os.getenv("POSTGRESQL_REPLICA_DB_CONNECT_STRING")
+    SQLALCHEMY_BINDS = (
+        {
+            "replica": {
+                "url": REPLICA_DATABASE_URI,
+                **engine_options(REPLICA_DATABASE_URI),
+            }
+        }
+        if REPLICA_DATABASE_URI
+        else {}
+    )
+    # connections each worker opens at startup, defaults to the pool size
+    DB_POOL_PREFILL = int(
+        os.getenv(
+            "FLASK_DB_POOL_PREFILL",
+            SQLALCHEMY_ENGINE_OPTIONS.get("pool_size", 0),
+        )
+    )
     SECRET_KEY = os.getenv(
         "FLASK_SECRET_KEY", "dev-secret-key"
     )
@@ -19,3 +68,26 @@ class Config:
     CHARMHUB_URL = os.getenv(
         "FLASK_CHARMHUB_URL", "http://localhost:8045"
     )
+    # seconds a worker trusts its cached catalog version before checking
+    # the database for solutions published by other workers
+    CATALOG_VERSION_MAX_AGE = int(
+        os.getenv("FLASK_CATALOG_VERSION_MAX_AGE", "5")
+    )
+    # "memory" serves search from the in-process index of each worker,
+    # "database" from the full-text index of the database
+    SEARCH_BACKEND = os.getenv("FLASK_SEARCH_BACKEND", "memory")
+    # cache shared by the workers for Launchpad and Store API lookups,
+    # redis://host:port/db or sqlite:///path, unset to cache per worker
+    CACHE_URL = os.getenv("FLASK_CACHE_URL")
+    # users whose Launchpad teams are kept in memory, per worker
+    LAUNCHPAD_TEAMS_CACHE_SIZE = int(
+        os.getenv("FLASK_LAUNCHPAD_TEAMS_CACHE_SIZE", "4096")
+    )
+    # resolve the Launchpad teams at login and embed them in the JWT,
+    # trusted for JWT_TEAMS_MAX_AGE seconds before they are looked up again
+    JWT_TEAMS_CLAIM = (
+        os.getenv("FLASK_JWT_TEAMS_CLAIM", "false").lower() == "true"
+    )
+    JWT_TEAMS_MAX_AGE = int(os.getenv("FLASK_JWT_TEAMS_MAX_AGE", "900"))
+    # verified tokens kept in memory, per worker
+    JWT_CACHE_SIZE = int(os.getenv("FLASK_JWT_CACHE_SIZE", "4096"))
@@ -0,0 +1,84 @@
+"""Add full-text search over published solutions
+
+Revision ID: 3f1c2b9a8d47
+Revises: 7d6efdfd9c2a
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2b9a8d47"
+down_revision = "7d6efdfd9c2a"
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute(
+            "ALTER TABLE solution ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_solution_search_vector ON solution "
+            "USING gin (search_vector)"
+        )
+
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE solution_fts "
+            "USING fts5(title, summary, description)"
+        )
+        op.execute(
+            "INSERT INTO solution_fts (rowid, title, summary, description) "
+            "SELECT id, title, summary, description FROM solution "
+            "WHERE status = 'PUBLISHED' AND visibility = 'PUBLIC'"
+        )
+        op.execute(
+            "CREATE TRIGGER solution_fts_insert AFTER INSERT ON solution "
+            "WHEN new.status = 'PUBLISHED' AND new.visibility = 'PUBLIC' "
+            "BEGIN "
+            "INSERT INTO solution_fts (rowid, title, summary, description) "
+            "VALUES (new.id, new.title, new.summary, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER solution_fts_update AFTER UPDATE ON solution "
+            "BEGIN "
+            "DELETE FROM solution_fts WHERE rowid = old.id; "
+            "INSERT INTO solution_fts (rowid, title, summary, description) "
+            "SELECT new.id, new.title, new.summary, new.description "
+            "WHERE new.status = 'PUBLISHED' AND new.visibility = 'PUBLIC'; "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER solution_fts_delete AFTER DELETE ON solution "
+            "BEGIN "
+            "DELETE FROM solution_fts WHERE rowid = old.id; "
+            "END"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_solution_search_vector")
+        op.execute("ALTER TABLE solution DROP COLUMN search_vector")
+
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS solution_fts_insert")
+        op.execute("DROP TRIGGER IF EXISTS solution_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS solution_fts_delete")
+        op.execute("DROP TABLE IF EXISTS solution_fts")
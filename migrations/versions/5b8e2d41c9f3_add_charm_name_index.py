@@ -0,0 +1,27 @@
+"""Add an index on charm.charm_name
+
+Revision ID: 5b8e2d41c9f3
+Revises: 3f1c2b9a8d47
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5b8e2d41c9f3"
+down_revision = "3f1c2b9a8d47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("charm", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_charm_charm_name"), ["charm_name"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("charm", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_charm_charm_name"))
@@ -0,0 +1,60 @@
+"""Add indexes on the columns filtered by hot queries
+
+Revision ID: 8a4d6f0e2b17
+Revises: 5b8e2d41c9f3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a4d6f0e2b17"
+down_revision = "5b8e2d41c9f3"
+branch_labels = None
+depends_on = None
+
+
+# index name -> (table, columns)
+INDEXES = {
+    "ix_solution_status": ("solution", ["status"]),
+    "ix_solution_visibility": ("solution", ["visibility"]),
+    "ix_solution_name_status": ("solution", ["name", "status"]),
+    "ix_solution_publisher_id": ("solution", ["publisher_id"]),
+    "ix_charm_solution_id": ("charm", ["solution_id"]),
+    "ix_use_case_solution_id": ("use_case", ["solution_id"]),
+    "ix_useful_link_solution_id": ("useful_link", ["solution_id"]),
+    "ix_review_action_solution_id": ("review_action", ["solution_id"]),
+    "ix_solution_maintainer_maintainer_id": (
+        "solution_maintainer",
+        ["maintainer_id"],
+    ),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY does not lock out writes, but cannot
+        # run inside the migration transaction
+        with op.get_context().autocommit_block():
+            for name, (table, columns) in INDEXES.items():
+                op.create_index(
+                    name, table, columns, postgresql_concurrently=True
+                )
+        return
+
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, (table, _) in INDEXES.items():
+                op.drop_index(
+                    name, table_name=table, postgresql_concurrently=True
+                )
+        return
+
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
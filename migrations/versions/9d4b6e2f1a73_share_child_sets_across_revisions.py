@@ -0,0 +1,318 @@
+"""Store charms, use cases, useful links and maintainers in shared child sets
+
+Revision ID: 9d4b6e2f1a73
+Revises: f3c8d2a6b415
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4b6e2f1a73"
+down_revision = "f3c8d2a6b415"
+branch_labels = None
+depends_on = None
+
+
+# child table -> (kind of set, Solution column, item columns)
+CHILD_TABLES = {
+    "charm": ("charms", "charm_set_id", ("charm_name",)),
+    "use_case": ("use_cases", "use_case_set_id", ("title", "description")),
+    "useful_link": ("useful_links", "useful_link_set_id", ("title", "url")),
+}
+SET_COLUMNS = [column for _, column, _ in CHILD_TABLES.values()] + [
+    "maintainer_set_id"
+]
+
+child_set = sa.table(
+    "child_set",
+    sa.column("id", sa.Integer),
+    sa.column("kind", sa.String),
+    sa.column("digest", sa.String),
+)
+solution = sa.table(
+    "solution", sa.column("id", sa.Integer), *map(sa.column, SET_COLUMNS)
+)
+solution_maintainer = sa.table(
+    "solution_maintainer",
+    sa.column("solution_id", sa.Integer),
+    sa.column("maintainer_id", sa.Integer),
+)
+child_set_maintainer = sa.table(
+    "child_set_maintainer",
+    sa.column("set_id", sa.Integer),
+    sa.column("maintainer_id", sa.Integer),
+)
+
+
+def child_table(name):
+    _, _, columns = CHILD_TABLES[name]
+    return sa.table(
+        name,
+        sa.column("id", sa.Integer),
+        sa.column("solution_id", sa.Integer),
+        sa.column("set_id", sa.Integer),
+        *map(sa.column, columns),
+    )
+
+
+def digest(kind, items):
+    # must match app.child_sets.child_set_digest
+    payload = json.dumps([kind, items], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def normalized_values(columns, rows):
+    """
+    The column values of the child rows of a revision, normalized like
+    app.child_sets.charm_items, use_case_items and useful_link_items.
+    """
+    values = []
+    for row in rows:
+        value = [(row[column] or "").strip() for column in columns]
+        if all(value) and value not in values:
+            values.append(value)
+    return values
+
+
+def find_or_create_set(connection, sets, kind, items):
+    """The id of the set of `items` and whether it was created."""
+    key = digest(kind, items)
+    if key in sets:
+        return sets[key], False
+
+    sets[key] = connection.execute(
+        sa.insert(child_set)
+        .values(kind=kind, digest=key)
+        .returning(child_set.c.id)
+    ).scalar_one()
+    return sets[key], True
+
+
+def upgrade():
+    op.create_table(
+        "child_set",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("digest"),
+    )
+    op.create_table(
+        "child_set_maintainer",
+        sa.Column("set_id", sa.Integer(), nullable=False),
+        sa.Column("maintainer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["set_id"], ["child_set.id"]),
+        sa.ForeignKeyConstraint(["maintainer_id"], ["maintainer.id"]),
+        sa.PrimaryKeyConstraint("set_id", "maintainer_id"),
+    )
+    op.create_index(
+        "ix_child_set_maintainer_maintainer_id",
+        "child_set_maintainer",
+        ["maintainer_id"],
+    )
+    # the solution table is altered in place, a batch copy would drop the
+    # full text search triggers of SQLite, which cannot add foreign keys
+    # to an existing table
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    for column in SET_COLUMNS:
+        op.add_column("solution", sa.Column(column, sa.Integer()))
+        if not sqlite:
+            op.create_foreign_key(
+                f"solution_{column}_fkey",
+                "solution",
+                "child_set",
+                [column],
+                ["id"],
+            )
+        op.create_index(f"ix_solution_{column}", "solution", [column])
+    for table in CHILD_TABLES:
+        op.add_column(table, sa.Column("set_id", sa.Integer(), nullable=True))
+
+    # store each normalized collection once, in the set of the first
+    # revision holding it, and point the revisions holding it at that set
+    connection = op.get_bind()
+    sets = {}
+    for table, (kind, set_column, columns) in CHILD_TABLES.items():
+        rows = child_table(table)
+        children = {}
+        for row in connection.execute(
+            sa.select(rows).order_by(rows.c.id)
+        ).mappings():
+            children.setdefault(row["solution_id"], []).append(row)
+
+        for solution_id, solution_rows in children.items():
+            values = normalized_values(columns, solution_rows)
+            connection.execute(
+                sa.delete(rows).where(
+                    rows.c.id.in_([row["id"] for row in solution_rows])
+                )
+            )
+            if not values:
+                continue
+
+            items = (
+                [charm_name for (charm_name,) in values]
+                if kind == "charms"
+                else values
+            )
+            set_id, created = find_or_create_set(
+                connection, sets, kind, items
+            )
+            if created:
+                # solution_id is still required, it is dropped below
+                connection.execute(
+                    sa.insert(rows),
+                    [
+                        {
+                            "solution_id": solution_id,
+                            "set_id": set_id,
+                            **dict(zip(columns, value)),
+                        }
+                        for value in values
+                    ],
+                )
+            connection.execute(
+                sa.update(solution)
+                .where(solution.c.id == solution_id)
+                .values({set_column: set_id})
+            )
+
+    maintainers = {}
+    for row in connection.execute(sa.select(solution_maintainer)):
+        maintainers.setdefault(row.solution_id, []).append(row.maintainer_id)
+    for solution_id, maintainer_ids in maintainers.items():
+        set_id, created = find_or_create_set(
+            connection, sets, "maintainers", sorted(maintainer_ids)
+        )
+        if created:
+            connection.execute(
+                sa.insert(child_set_maintainer),
+                [
+                    {"set_id": set_id, "maintainer_id": maintainer_id}
+                    for maintainer_id in maintainer_ids
+                ],
+            )
+        connection.execute(
+            sa.update(solution)
+            .where(solution.c.id == solution_id)
+            .values(maintainer_set_id=set_id)
+        )
+
+    op.drop_table("solution_maintainer")
+    with op.batch_alter_table("charm") as batch_op:
+        batch_op.drop_constraint("_solution_charm_uc", type_="unique")
+        batch_op.create_unique_constraint(
+            "_charm_set_charm_uc", ["set_id", "charm_name"]
+        )
+    for table in CHILD_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f"ix_{table}_solution_id")
+            batch_op.drop_column("solution_id")
+            batch_op.alter_column(
+                "set_id", existing_type=sa.Integer(), nullable=False
+            )
+            batch_op.create_foreign_key(
+                f"{table}_set_id_fkey", "child_set", ["set_id"], ["id"]
+            )
+            batch_op.create_index(f"ix_{table}_set_id", ["set_id"])
+
+
+def downgrade():
+    op.create_table(
+        "solution_maintainer",
+        sa.Column("solution_id", sa.Integer(), nullable=False),
+        sa.Column("maintainer_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["maintainer_id"], ["maintainer.id"]),
+        sa.ForeignKeyConstraint(["solution_id"], ["solution.id"]),
+        sa.PrimaryKeyConstraint("solution_id", "maintainer_id"),
+    )
+    op.create_index(
+        "ix_solution_maintainer_maintainer_id",
+        "solution_maintainer",
+        ["maintainer_id"],
+    )
+    for table in CHILD_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("solution_id", sa.Integer()))
+            batch_op.alter_column(
+                "set_id", existing_type=sa.Integer(), nullable=True
+            )
+
+    # give every revision its own copy of the rows of its sets
+    connection = op.get_bind()
+    revisions = connection.execute(sa.select(solution)).mappings().all()
+    for table, (_, set_column, columns) in CHILD_TABLES.items():
+        rows = child_table(table)
+        for revision in revisions:
+            set_id = revision[set_column]
+            if set_id is None:
+                continue
+            connection.execute(
+                sa.insert(rows).from_select(
+                    ["solution_id", *columns],
+                    sa.select(
+                        sa.literal(revision["id"]),
+                        *(rows.c[column] for column in columns),
+                    )
+                    .where(rows.c.set_id == set_id)
+                    .order_by(rows.c.id),
+                )
+            )
+        connection.execute(sa.delete(rows).where(rows.c.set_id.isnot(None)))
+
+    for revision in revisions:
+        if revision["maintainer_set_id"] is None:
+            continue
+        connection.execute(
+            sa.insert(solution_maintainer).from_select(
+                ["solution_id", "maintainer_id"],
+                sa.select(
+                    sa.literal(revision["id"]),
+                    child_set_maintainer.c.maintainer_id,
+                ).where(
+                    child_set_maintainer.c.set_id
+                    == revision["maintainer_set_id"]
+                ),
+            )
+        )
+
+    for table in CHILD_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f"ix_{table}_set_id")
+            batch_op.drop_constraint(
+                f"{table}_set_id_fkey", type_="foreignkey"
+            )
+            if table == "charm":
+                batch_op.drop_constraint("_charm_set_charm_uc", type_="unique")
+            batch_op.drop_column("set_id")
+            batch_op.alter_column(
+                "solution_id", existing_type=sa.Integer(), nullable=False
+            )
+            batch_op.create_foreign_key(
+                f"{table}_solution_id_fkey",
+                "solution",
+                ["solution_id"],
+                ["id"],
+            )
+            batch_op.create_index(f"ix_{table}_solution_id", ["solution_id"])
+    with op.batch_alter_table("charm") as batch_op:
+        batch_op.create_unique_constraint(
+            "_solution_charm_uc", ["solution_id", "charm_name"]
+        )
+
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    for column in SET_COLUMNS:
+        op.drop_index(f"ix_solution_{column}", table_name="solution")
+        if not sqlite:
+            op.drop_constraint(
+                f"solution_{column}_fkey", "solution", type_="foreignkey"
+            )
+        op.drop_column("solution", column)
+    op.drop_table("child_set_maintainer")
+    op.drop_table("child_set")
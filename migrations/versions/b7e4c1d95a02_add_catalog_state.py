@@ -0,0 +1,30 @@
+"""Add the catalog_state row counting catalog changes
+
+Revision ID: b7e4c1d95a02
+Revises: 9d4b6e2f1a73
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e4c1d95a02"
+down_revision = "9d4b6e2f1a73"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_state = op.create_table(
+        "catalog_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("serial", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(catalog_state, [{"id": 1, "serial": 0}])
+
+
+def downgrade():
+    op.drop_table("catalog_state")
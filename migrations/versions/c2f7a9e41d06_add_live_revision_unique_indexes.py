@@ -0,0 +1,71 @@
+"""Allow at most one published and one draft revision per solution
+
+Revision ID: c2f7a9e41d06
+Revises: 8a4d6f0e2b17
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c2f7a9e41d06"
+down_revision = "8a4d6f0e2b17"
+branch_labels = None
+depends_on = None
+
+
+# index name -> status of the revision it keeps unique per name
+INDEXES = {
+    "uq_solution_published_name": "PUBLISHED",
+    "uq_solution_draft_name": "DRAFT",
+}
+
+
+def upgrade():
+    # publishing a draft of a later revision used to leave the previous
+    # revision published, keep only the latest revision in each status
+    for status in INDEXES.values():
+        op.execute(
+            "UPDATE solution SET status = 'UNPUBLISHED' "
+            f"WHERE status = '{status}' AND revision < ("
+            "SELECT max(latest.revision) FROM solution AS latest "
+            "WHERE latest.name = solution.name "
+            f"AND latest.status = '{status}')"
+        )
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, status in INDEXES.items():
+                op.create_index(
+                    name,
+                    "solution",
+                    ["name"],
+                    unique=True,
+                    postgresql_where=sa.text(f"status = '{status}'"),
+                    postgresql_concurrently=True,
+                )
+        return
+
+    for name, status in INDEXES.items():
+        op.create_index(
+            name,
+            "solution",
+            ["name"],
+            unique=True,
+            sqlite_where=sa.text(f"status = '{status}'"),
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name in INDEXES:
+                op.drop_index(
+                    name, table_name="solution", postgresql_concurrently=True
+                )
+        return
+
+    for name in INDEXES:
+        op.drop_index(name, table_name="solution")
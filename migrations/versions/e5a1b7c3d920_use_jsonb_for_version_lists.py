@@ -0,0 +1,65 @@
+"""Store version and prerequisite lists as JSONB with GIN indexes
+
+Revision ID: e5a1b7c3d920
+Revises: c2f7a9e41d06
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "e5a1b7c3d920"
+down_revision = "c2f7a9e41d06"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ("platform_version", "platform_prerequisites", "juju_versions")
+
+
+def upgrade():
+    # SQLite keeps JSON, its containment queries go through json_each
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for column in COLUMNS:
+        op.alter_column(
+            "solution",
+            column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.create_index(
+                f"ix_solution_{column}",
+                "solution",
+                [column],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.drop_index(
+                f"ix_solution_{column}",
+                table_name="solution",
+                postgresql_concurrently=True,
+            )
+
+    for column in COLUMNS:
+        op.alter_column(
+            "solution",
+            column,
+            type_=sa.JSON(),
+            postgresql_using=f"{column}::json",
+        )
@@ -0,0 +1,38 @@
+"""Add the solution_archive table for compacted revisions
+
+Revision ID: f3c8d2a6b415
+Revises: e5a1b7c3d920
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3c8d2a6b415"
+down_revision = "e5a1b7c3d920"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "solution_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("hash", sa.String(length=16), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("publisher_id", sa.String(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("hash"),
+        sa.UniqueConstraint(
+            "name", "revision", name="_solution_archive_revision_uc"
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("solution_archive")
@@ -3,16 +3,35 @@ from app.models import (
     Solution,
     Publisher,
     Maintainer,
-    Charm,
-    UseCase,
-    UsefulLink,
     PlatformTypes,
     SolutionStatus,
     Visibility,
     Creator,
+    Charm,
+    ChildSet,
+    ReviewAction,
+    ReviewerActionType,
+    UseCase,
+    UsefulLink,
+    child_set_maintainer,
+)
+from app.child_sets import (
+    CHARMS,
+    MAINTAINERS,
+    USE_CASES,
+    USEFUL_LINKS,
+    charm_set_id,
+    child_set_digest,
+    maintainer_set_id,
+    use_case_set_id,
+    useful_link_set_id,
 )
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import func, insert, text
 from app import create_app
+import argparse
+import random
 import uuid
 import os
 
@@ -396,37 +415,18 @@ def seed_database():
                 juju_versions=data["compatibility"]["juju_versions"],
                 publisher_id=publisher.publisher_id,
                 creator_id=creator.id,
-                maintainers=maintainers,
+                charm_set_id=charm_set_id(
+                    charm_data["name"] for charm_data in data["charms"]
+                ),
+                use_case_set_id=use_case_set_id(data["use_cases"]),
+                useful_link_set_id=useful_link_set_id(data["useful_links"]),
+                maintainer_set_id=maintainer_set_id(maintainers),
                 visibility=Visibility.PUBLIC,
             )
 
             db.session.add(solution)
             db.session.commit()
 
-            for charm_data in data["charms"]:
-                charm = Charm(
-                    charm_name=charm_data["name"], solution_id=solution.id
-                )
-                db.session.add(charm)
-
-            for use_case_data in data["use_cases"]:
-                use_case = UseCase(
-                    title=use_case_data["title"],
-                    description=use_case_data["description"],
-                    solution_id=solution.id,
-                )
-                db.session.add(use_case)
-
-            for link_data in data["useful_links"]:
-                link = UsefulLink(
-                    title=link_data["title"],
-                    url=link_data["url"],
-                    solution_id=solution.id,
-                )
-                db.session.add(link)
-
-            db.session.commit()
-
         # Add a solution with pending_name_review status
         identity_platform_publisher = Publisher.query.filter_by(username="identity-platform").first()
         if not identity_platform_publisher:
@@ -476,5 +476,432 @@ def seed_database():
         print("Database seeded successfully")
 
 
+# words the generated titles, summaries and descriptions are made of
+WORDS = (
+    "observability monitoring logging metrics tracing kubernetes cloud "
+    "database postgresql mysql mongodb kafka spark identity oauth ldap "
+    "machine learning mlops notebook pipeline storage ceph object backup "
+    "network edge telco openstack web proxy ingress cache redis search "
+    "analytics streaming security vault certificate secure scalable "
+    "managed production ready highly available lightweight enterprise"
+).split()
+JUJU_VERSIONS = ["2.9", "3.1", "3.4", "3.5", "3.6"]
+K8S_VERSIONS = ["1.27", "1.28", "1.29", "1.30", "1.31"]
+REVIEWER = "reviewer@canonical.com"
+
+# share of revisions changing each child collection of their parent
+COLLECTION_CHANGE_RATE = 0.2
+# share of solutions with an unpublished draft on top of the published one
+DRAFT_RATE = 0.1
+# share of solutions still waiting for their first review
+PENDING_RATE = 0.05
+# share of published solutions hidden from the public catalog
+PRIVATE_RATE = 0.1
+
+
+# generated tables with integer ids
+GENERATED_MODELS = (
+    ChildSet,
+    Charm,
+    UseCase,
+    UsefulLink,
+    Solution,
+    ReviewAction,
+    Creator,
+    Maintainer,
+)
+
+
+def zipf_weights(count):
+    """Cumulative weights giving the item of rank n a 1/n share."""
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class DatasetGenerator:
+    """
+    Bulk insert a synthetic catalog of `solutions` solutions owned by
+    `publishers` publishers. Every solution gets up to `max_revisions`
+    revisions sharing the child sets of their parent unless a collection
+    changed, and the review actions of its first revision. The same
+    `random_seed` always generates the same dataset.
+    """
+
+    def __init__(
+        self,
+        publishers,
+        solutions,
+        max_revisions=10,
+        random_seed=0,
+        batch_size=1000,
+    ):
+        self.publishers = publishers
+        self.solutions = solutions
+        self.max_revisions = max_revisions
+        self.batch_size = batch_size
+        self.rng = random.Random(random_seed)
+        self.now = datetime.now()
+
+        # publisher sizes and charm popularity follow Zipf distributions
+        self.publisher_weights = zipf_weights(publishers)
+        self.charm_names = [
+            f"charm-{index}" for index in range(max(50, solutions // 5))
+        ]
+        self.charm_weights = zipf_weights(len(self.charm_names))
+        # digest -> id of the child sets generated so far
+        self.set_ids = {}
+        self.next_ids = {}
+
+    def generate(self):
+        for model in GENERATED_MODELS:
+            self.next_ids[model] = (
+                db.session.query(func.max(model.id)).scalar() or 0
+            ) + 1
+
+        self.publisher_ids = self._insert_people()
+
+        for start in range(0, self.solutions, self.batch_size):
+            self.rows = {
+                table: []
+                for table in (
+                    ChildSet.__table__,
+                    Charm.__table__,
+                    UseCase.__table__,
+                    UsefulLink.__table__,
+                    child_set_maintainer,
+                    Solution.__table__,
+                    ReviewAction.__table__,
+                )
+            }
+            for index in range(
+                start, min(start + self.batch_size, self.solutions)
+            ):
+                self._solution(index)
+
+            # tables are filled in foreign key order
+            for table, rows in self.rows.items():
+                if rows:
+                    db.session.execute(insert(table), rows)
+            db.session.commit()
+            done = min(start + self.batch_size, self.solutions)
+            print(f"Generated {done}/{self.solutions} solutions")
+
+        self._sync_sequences()
+
+    def _id(self, model):
+        self.next_ids[model] += 1
+        return self.next_ids[model] - 1
+
+    def _insert_people(self):
+        publishers = [
+            {
+                "publisher_id": uuid.UUID(int=self.rng.getrandbits(128)).hex,
+                "username": f"generated-publisher-{index}",
+                "display_name": f"Generated Publisher {index}",
+            }
+            for index in range(self.publishers)
+        ]
+        self.creator_ids = [self._id(Creator) for _ in range(self.publishers)]
+        self.maintainer_ids = [
+            self._id(Maintainer) for _ in range(self.publishers * 2)
+        ]
+        db.session.execute(insert(Publisher.__table__), publishers)
+        db.session.execute(
+            insert(Creator.__table__),
+            [
+                {"id": id, "email": f"creator-{id}@example.com"}
+                for id in self.creator_ids
+            ],
+        )
+        db.session.execute(
+            insert(Maintainer.__table__),
+            [
+                {
+                    "id": id,
+                    "email": f"maintainer-{id}@example.com",
+                    "display_name": f"Maintainer {id}",
+                }
+                for id in self.maintainer_ids
+            ],
+        )
+        db.session.commit()
+        return [publisher["publisher_id"] for publisher in publishers]
+
+    def _sync_sequences(self):
+        # explicit ids do not advance the PostgreSQL sequences
+        if db.engine.dialect.name != "postgresql":
+            return
+        for model in GENERATED_MODELS:
+            table = model.__tablename__
+            db.session.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"coalesce(max(id), 1)) FROM {table}"
+                )
+            )
+        db.session.commit()
+
+    def _words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def _child_set(self, kind, items, rows):
+        if not items:
+            return None
+        digest = child_set_digest(kind, items)
+        if digest not in self.set_ids:
+            set_id = self._id(ChildSet)
+            self.set_ids[digest] = set_id
+            self.rows[ChildSet.__table__].append(
+                {"id": set_id, "kind": kind, "digest": digest}
+            )
+            table, values = rows(set_id)
+            self.rows[table].extend(values)
+        return self.set_ids[digest]
+
+    def _charm_set(self):
+        names = list(
+            dict.fromkeys(
+                self.rng.choices(
+                    self.charm_names,
+                    cum_weights=self.charm_weights,
+                    k=self.rng.randint(1, 8),
+                )
+            )
+        )
+        return self._child_set(
+            CHARMS,
+            names,
+            lambda set_id: (
+                Charm.__table__,
+                [
+                    {
+                        "id": self._id(Charm),
+                        "set_id": set_id,
+                        "charm_name": name,
+                    }
+                    for name in names
+                ],
+            ),
+        )
+
+    def _use_case_set(self):
+        items = [
+            [self._words(3).capitalize(), self._words(20).capitalize()]
+            for _ in range(self.rng.randint(1, 4))
+        ]
+        return self._child_set(
+            USE_CASES,
+            items,
+            lambda set_id: (
+                UseCase.__table__,
+                [
+                    {
+                        "id": self._id(UseCase),
+                        "set_id": set_id,
+                        "title": title,
+                        "description": description,
+                    }
+                    for title, description in items
+                ],
+            ),
+        )
+
+    def _useful_link_set(self, name):
+        items = [
+            [f"Link {number}", f"https://example.com/{name}/{number}"]
+            for number in range(self.rng.randint(0, 4))
+        ]
+        return self._child_set(
+            USEFUL_LINKS,
+            items,
+            lambda set_id: (
+                UsefulLink.__table__,
+                [
+                    {
+                        "id": self._id(UsefulLink),
+                        "set_id": set_id,
+                        "title": title,
+                        "url": url,
+                    }
+                    for title, url in items
+                ],
+            ),
+        )
+
+    def _maintainer_set(self):
+        ids = sorted(
+            self.rng.sample(self.maintainer_ids, self.rng.randint(1, 3))
+        )
+        return self._child_set(
+            MAINTAINERS,
+            ids,
+            lambda set_id: (
+                child_set_maintainer,
+                [{"set_id": set_id, "maintainer_id": id} for id in ids],
+            ),
+        )
+
+    def _sets(self, name, parent=None):
+        builders = {
+            "charm_set_id": self._charm_set,
+            "use_case_set_id": self._use_case_set,
+            "useful_link_set_id": lambda: self._useful_link_set(name),
+            "maintainer_set_id": self._maintainer_set,
+        }
+        return {
+            column: (
+                parent[column]
+                if parent and self.rng.random() >= COLLECTION_CHANGE_RATE
+                else build()
+            )
+            for column, build in builders.items()
+        }
+
+    def _solution(self, index):
+        rng = self.rng
+        name = f"solution-{index}"
+        (publisher_id,) = rng.choices(
+            self.publisher_ids, cum_weights=self.publisher_weights
+        )
+        platform = rng.choice(list(PlatformTypes))
+
+        pending = rng.random() < PENDING_RATE
+        depth = (
+            1
+            if pending
+            else min(self.max_revisions, 1 + int(rng.expovariate(0.5)))
+        )
+        statuses = [SolutionStatus.UNPUBLISHED] * (depth - 1)
+        if pending:
+            statuses.append(
+                rng.choice(
+                    [
+                        SolutionStatus.PENDING_NAME_REVIEW,
+                        SolutionStatus.PENDING_METADATA_REVIEW,
+                    ]
+                )
+            )
+        else:
+            statuses.append(SolutionStatus.PUBLISHED)
+            if depth < self.max_revisions and rng.random() < DRAFT_RATE:
+                statuses.append(SolutionStatus.DRAFT)
+
+        visibility = (
+            Visibility.PRIVATE
+            if pending or rng.random() < PRIVATE_RATE
+            else Visibility.PUBLIC
+        )
+        created = self.now - timedelta(days=rng.uniform(30, 3 * 365))
+        updated = created
+        revision = None
+
+        for number, status in enumerate(statuses, start=1):
+            updated = min(
+                self.now, updated + timedelta(days=rng.uniform(0.1, 60))
+            )
+            revision = {
+                "id": self._id(Solution),
+                "hash": uuid.UUID(int=rng.getrandbits(128)).hex[:16],
+                "name": name,
+                "revision": number,
+                "title": self._words(2).title(),
+                "summary": self._words(12).capitalize(),
+                "description": self._words(60).capitalize(),
+                "created": created,
+                "last_updated": updated,
+                "status": status,
+                "visibility": visibility,
+                "platform": platform,
+                "platform_version": (
+                    sorted(rng.sample(K8S_VERSIONS, 2))
+                    if platform == PlatformTypes.KUBERNETES
+                    else []
+                ),
+                "platform_prerequisites": [],
+                "juju_versions": sorted(
+                    rng.sample(JUJU_VERSIONS, rng.randint(1, 3))
+                ),
+                "publisher_id": publisher_id,
+                "creator_id": rng.choice(self.creator_ids),
+                "approved_by": (
+                    None
+                    if status == SolutionStatus.PENDING_NAME_REVIEW
+                    else REVIEWER
+                ),
+                **self._sets(name, revision),
+            }
+            self.rows[Solution.__table__].append(revision)
+
+            if number == 1:
+                self._review_actions(revision, status)
+
+    def _review_actions(self, revision, status):
+        if status == SolutionStatus.PENDING_NAME_REVIEW:
+            return
+        actions = [ReviewerActionType.APPROVE_REGISTRATION]
+        if status != SolutionStatus.PENDING_METADATA_REVIEW:
+            actions.append(ReviewerActionType.PUBLISH)
+        self.rows[ReviewAction.__table__].extend(
+            {
+                "id": self._id(ReviewAction),
+                "solution_id": revision["id"],
+                "reviewer_id": REVIEWER,
+                "action": action,
+                "comment": None,
+                "timestamp": revision["last_updated"],
+            }
+            for action in actions
+        )
+
+
+def generate_dataset(args):
+    with app.app_context():
+        if args.create_tables:
+            db.create_all()
+
+        if Solution.query.first() is not None:
+            print("Database already has solutions, skipping generation...")
+            return
+
+        DatasetGenerator(
+            publishers=args.publishers,
+            solutions=args.solutions,
+            max_revisions=args.max_revisions,
+            random_seed=args.random_seed,
+            batch_size=args.batch_size,
+        ).generate()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Seed the database with mock data, or generate a "
+        "synthetic dataset for load tests and benchmarks."
+    )
+    parser.add_argument(
+        "--generate",
+        action="store_true",
+        help="generate a synthetic dataset instead of the mock data",
+    )
+    parser.add_argument("--publishers", type=int, default=100)
+    parser.add_argument("--solutions", type=int, default=10000)
+    parser.add_argument("--max-revisions", type=int, default=10)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="solutions inserted per transaction",
+    )
+    parser.add_argument(
+        "--create-tables",
+        action="store_true",
+        help="create missing tables from the models first (SQLite)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    args = parse_args()
+    if args.generate:
+        generate_dataset(args)
+    else:
+        seed_database()
\ No newline at end of file
@@ -0,0 +1,120 @@
+import uuid
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from app.cache import caches
+from app.child_sets import (
+    charm_set_id,
+    maintainer_set_id,
+    use_case_set_id,
+    useful_link_set_id,
+)
+from app.extensions import db
+from app.models import (
+    Creator,
+    Maintainer,
+    PlatformTypes,
+    Publisher,
+    Solution,
+    SolutionStatus,
+    Visibility,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Start every test with empty lookup caches.
+    """
+    for cache in caches.values():
+        cache.clear()
+
+
+@pytest.fixture
+def db_app():
+    """
+    Create a Flask app backed by an in-memory SQLite database.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def lazy_load_guard(db_app):
+    """
+    Fail the test if any relationship is lazy loaded while it runs.
+    """
+    lazy_loads = []
+
+    def _record_lazy_load(orm_execute_state):
+        if orm_execute_state.lazy_loaded_from is not None:
+            lazy_loads.append(orm_execute_state.statement)
+
+    event.listen(db.session, "do_orm_execute", _record_lazy_load)
+    yield
+    event.remove(db.session, "do_orm_execute", _record_lazy_load)
+
+    assert not lazy_loads, f"{len(lazy_loads)} unexpected lazy load(s)"
+
+
+def make_solution(
+    name,
+    revision=1,
+    status=SolutionStatus.PUBLISHED,
+    visibility=Visibility.PUBLIC,
+    publisher=None,
+    charms=("charm-a", "charm-b"),
+    **columns,
+):
+    """
+    Add a solution with one of each child collection to the session.
+    """
+    if publisher is None:
+        publisher = db.session.get(Publisher, "publisher-id") or Publisher(
+            publisher_id="publisher-id",
+            username="publisher",
+            display_name="Publisher",
+        )
+    creator = db.session.query(Creator).first() or Creator(
+        email="creator@example.com"
+    )
+    maintainer = db.session.query(Maintainer).first() or Maintainer(
+        display_name="Maintainer", email="maintainer@example.com"
+    )
+    db.session.add(maintainer)
+    db.session.flush()
+
+    columns.setdefault("title", name.replace("-", " ").title())
+    columns.setdefault("summary", f"Summary of {name}")
+    columns.setdefault("platform", PlatformTypes.KUBERNETES)
+
+    solution = Solution(
+        hash=uuid.uuid4().hex[:16],
+        name=name,
+        revision=revision,
+        status=status,
+        visibility=visibility,
+        publisher=publisher,
+        creator=creator,
+        charm_set_id=charm_set_id(charms),
+        use_case_set_id=use_case_set_id(
+            [{"title": "Use case", "description": "Description"}]
+        ),
+        useful_link_set_id=useful_link_set_id(
+            [{"title": "Docs", "url": "https://example.com"}]
+        ),
+        maintainer_set_id=maintainer_set_id([maintainer]),
+        **columns,
+    )
+    db.session.add(solution)
+    return solution
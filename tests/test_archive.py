@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.archive import (
+    archive_revisions_command,
+    archive_unpublished_revisions,
+    get_archived_revision,
+)
+from app.extensions import db
+from app.models import (
+    Charm,
+    ChildSet,
+    ReviewAction,
+    ReviewerActionType,
+    Solution,
+    SolutionArchive,
+    SolutionStatus,
+)
+from app.public.logic import (
+    get_preview_solution_validators,
+    get_published_solution_by_hash,
+)
+from conftest import make_solution
+
+
+def make_history():
+    old = make_solution(
+        "solution", status=SolutionStatus.UNPUBLISHED, charms=("charm-a",)
+    )
+    recent = make_solution(
+        "solution", revision=2, status=SolutionStatus.UNPUBLISHED
+    )
+    current = make_solution("solution", revision=3)
+    db.session.flush()
+    db.session.add(
+        ReviewAction(
+            solution_id=old.id,
+            reviewer_id="reviewer@example.com",
+            action=ReviewerActionType.PUBLISH,
+        )
+    )
+    old.last_updated = datetime.now() - timedelta(days=60)
+    db.session.commit()
+    return old.hash, recent.hash, current.hash
+
+
+def test_archive_moves_old_unpublished_revisions(db_app):
+    make_history()
+
+    assert archive_unpublished_revisions(timedelta(days=30), 1) == 1
+
+    revisions = db.session.query(Solution.revision).order_by(
+        Solution.revision
+    )
+    assert [revision for (revision,) in revisions] == [2, 3]
+    assert db.session.query(SolutionArchive).count() == 1
+    assert db.session.query(ReviewAction).count() == 0
+    # the later revisions still share their charm set, the one of the
+    # archived revision is pruned
+    charms = db.session.query(Charm.charm_name).order_by(Charm.charm_name)
+    assert [charm_name for (charm_name,) in charms] == ["charm-a", "charm-b"]
+    assert db.session.query(ChildSet).filter_by(kind="charms").count() == 1
+
+
+def test_archived_revision_is_restored_for_history(db_app):
+    make_history()
+    archive_unpublished_revisions(timedelta(days=30))
+
+    revision = get_archived_revision("solution", 1)
+
+    assert revision["revision"] == 1
+    assert revision["status"] == "unpublished"
+    assert [c["charm_name"] for c in revision["charms"]] == ["charm-a"]
+    assert revision["review_actions"][0]["action"] == "publish"
+    assert get_archived_revision("solution", 2) is None
+
+
+def test_preview_of_archived_revision_shows_published_one(db_app):
+    old_hash, _, current_hash = make_history()
+    archive_unpublished_revisions(timedelta(days=30))
+
+    assert get_published_solution_by_hash(old_hash)["hash"] == current_hash
+    assert get_preview_solution_validators(old_hash)[0] == current_hash
+
+
+def test_scheduled_archiving_runs_again_after_interval(db_app):
+    make_history()
+
+    with patch(
+        "app.archive.time.sleep", side_effect=[None, KeyboardInterrupt]
+    ) as mock_sleep:
+        result = db_app.test_cli_runner().invoke(
+            archive_revisions_command, ["--every-hours", "24"]
+        )
+
+    assert result.output.splitlines()[:2] == [
+        "Archived 1 revision(s)",
+        "Archived 0 revision(s)",
+    ]
+    mock_sleep.assert_called_with(24 * 3600)
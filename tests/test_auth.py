@@ -0,0 +1,127 @@
+import time
+import jwt
+import pytest
+from unittest.mock import patch
+from app.public.api import public_bp
+from app.public.auth import encode_jwt_token, verified_tokens
+from app.public.launchpad import get_user_teams
+
+SECRET_KEY = "test-secret-key-of-at-least-32-bytes"
+
+
+@pytest.fixture
+def client(db_app):
+    db_app.config["JWT_TEAMS_CLAIM"] = True
+    db_app.config["JWT_TEAMS_MAX_AGE"] = 60
+    db_app.register_blueprint(public_bp, url_prefix="/api")
+
+    with patch("app.public.auth.SECRET_KEY", SECRET_KEY):
+        yield db_app.test_client()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@patch("app.public.api.verify_signature", return_value=True)
+@patch.object(get_user_teams, "refresh", return_value=["team1"])
+def test_login_embeds_teams(mock_get_user_teams, mock_verify, client):
+    response = client.post(
+        "/api/login",
+        json={"username": "testuser", "timestamp": "1", "signature": "s"},
+    )
+    token = response.get_json()["token"]
+
+    with patch("app.public.auth.get_user_teams") as mock_lookup:
+        response = client.get("/api/me", headers=bearer(token))
+
+    assert response.get_json()["user"]["teams"] == ["team1"]
+    mock_lookup.assert_not_called()
+
+
+@patch("app.public.api.verify_signature", return_value=True)
+@patch.object(get_user_teams, "refresh", side_effect=Exception("down"))
+def test_login_without_teams_when_lookup_fails(
+    mock_get_user_teams, mock_verify, client
+):
+    response = client.post(
+        "/api/login",
+        json={"username": "testuser", "timestamp": "1", "signature": "s"},
+    )
+    token = response.get_json()["token"]
+
+    with patch(
+        "app.public.auth.get_user_teams", return_value=["team2"]
+    ) as mock_lookup:
+        response = client.get("/api/me", headers=bearer(token))
+
+    assert response.get_json()["user"]["teams"] == ["team2"]
+    mock_lookup.assert_called_once_with("testuser")
+
+
+@patch("app.public.auth.get_user_teams", return_value=["team2"])
+def test_stale_teams_are_looked_up(mock_get_user_teams, client):
+    with patch("app.public.auth.time.time", return_value=time.time() - 120):
+        token = encode_jwt_token("testuser", int(time.time()) + 3600, ["old"])
+
+    response = client.get("/api/me", headers=bearer(token))
+
+    assert response.get_json()["user"]["teams"] == ["team2"]
+    mock_get_user_teams.assert_called_once_with("testuser")
+
+
+@patch.object(get_user_teams, "refresh", return_value=["team2"])
+def test_refresh_keeps_expiry(mock_get_user_teams, client):
+    expires_at = int(time.time()) + 30
+    token = encode_jwt_token("testuser", expires_at, ["team1"])
+
+    response = client.post("/api/login/refresh", headers=bearer(token))
+    refreshed = response.get_json()["token"]
+
+    with patch("app.public.auth.get_user_teams") as mock_lookup:
+        response = client.get("/api/me", headers=bearer(refreshed))
+
+    assert response.get_json()["user"]["teams"] == ["team2"]
+    mock_lookup.assert_not_called()
+    payload = jwt.decode(refreshed, SECRET_KEY, algorithms=["HS256"])
+    assert payload["exp"] == expires_at
+    # the teams never outlive the token
+    assert payload["teams_exp"] == expires_at
+
+
+@patch("app.public.auth.get_user_teams", return_value=["team1"])
+def test_verified_tokens_are_cached(mock_get_user_teams, client):
+    token = encode_jwt_token("testuser", int(time.time()) + 3600)
+    before = verified_tokens.status()
+
+    with patch("app.public.auth.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(3):
+            response = client.get("/api/me", headers=bearer(token))
+            assert response.status_code == 200
+
+    decode.assert_called_once()
+    status = verified_tokens.status()
+    assert status["hits"] - before["hits"] == 2
+    assert status["verifications"] - before["verifications"] == 1
+    assert status["saved_seconds"] > before["saved_seconds"]
+
+
+def test_invalid_tokens_are_cached(client):
+    before = verified_tokens.status()
+
+    with patch("app.public.auth.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(2):
+            response = client.get("/api/me", headers=bearer("invalid"))
+            assert response.status_code == 401
+
+    decode.assert_called_once()
+    after = verified_tokens.status()
+    assert after["negative_hits"] - before["negative_hits"] == 1
+
+
+def test_verified_tokens_expire_with_the_token(client):
+    token = encode_jwt_token("testuser", int(time.time()) + 5)
+
+    assert verified_tokens.verify(token)["sub"] == "testuser"
+    (entry,) = verified_tokens._entries.values()
+    assert entry.expires_at <= verified_tokens.clock() + 5
@@ -0,0 +1,204 @@
+import threading
+import time
+import traceback
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.cache import (
+    RedisBackend,
+    SQLiteBackend,
+    TTLCache,
+    cache_backend,
+    configure_shared_backend,
+    ttl_cache,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(condition, timeout=1):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_entries_expire_per_key(clock):
+    cache = TTLCache(ttl=10, jitter=0, clock=clock)
+    cache.get("a", lambda: 1)
+    clock.now = 5
+    cache.get("b", lambda: 2)
+    clock.now = 12
+
+    assert cache.get("a", lambda: 3) == 3
+    assert cache.get("b", lambda: 4) == 2
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 3
+
+
+def test_jitter_shortens_ttl(clock):
+    cache = TTLCache(ttl=100, jitter=0.5, clock=clock)
+    for key in range(20):
+        cache.get(key, lambda: key)
+
+    expiries = {entry.expires_at for entry in cache._entries.values()}
+    assert len(expiries) > 1
+    assert all(50 <= expiry <= 100 for expiry in expiries)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(ttl=10, maxsize=2, clock=clock)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: None)
+    cache.get("c", lambda: 3)
+
+    assert cache.get("a", lambda: None) == 1
+    assert cache.get("b", lambda: "reloaded") == "reloaded"
+    assert cache.stats.evictions == 2
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = TTLCache(ttl=10, clock=clock)
+    release = threading.Event()
+    loader = Mock(side_effect=lambda: release.wait() and "teams")
+    results = []
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get("user", loader))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: cache.stats.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["teams"] * 5
+    loader.assert_called_once()
+
+
+def test_stale_entry_is_served_while_refreshing(clock):
+    cache = TTLCache(ttl=10, stale_ttl=60, jitter=0, clock=clock)
+    cache.get("user", lambda: "old")
+    clock.now = 20
+
+    assert cache.get("user", lambda: "new") == "old"
+    wait_for(lambda: not cache._flights)
+    assert cache.get("user", lambda: None) == "new"
+    assert cache.stats.stale_hits == 1
+
+
+def test_failed_refresh_keeps_stale_entry(clock):
+    cache = TTLCache(ttl=10, stale_ttl=60, jitter=0, clock=clock)
+    cache.get("user", lambda: "old")
+    clock.now = 20
+
+    def fail():
+        raise RuntimeError("Launchpad is down")
+
+    assert cache.get("user", fail) == "old"
+    wait_for(lambda: not cache._flights)
+    assert cache.get("user", fail) == "old"
+    assert cache.stats.refresh_errors >= 1
+
+
+def test_failures_are_cached_briefly(clock):
+    cache = TTLCache(ttl=10, negative_ttl=2, clock=clock)
+    loader = Mock(side_effect=RuntimeError("not found"))
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            cache.get("user", loader)
+    clock.now = 3
+    with pytest.raises(RuntimeError):
+        cache.get("user", loader)
+
+    assert loader.call_count == 2
+    assert cache.stats.negative_hits == 2
+
+
+def test_cached_failures_do_not_grow_tracebacks(clock):
+    cache = TTLCache(ttl=10, negative_ttl=2, clock=clock)
+
+    def depth():
+        with pytest.raises(RuntimeError) as info:
+            cache.get("user", Mock(side_effect=RuntimeError("not found")))
+        return len(traceback.extract_tb(info.value.__traceback__))
+
+    depth()
+    assert len({depth() for _ in range(10)}) == 1
+
+
+@pytest.fixture
+def shared_cache(tmp_path):
+    configure_shared_backend(f"sqlite:///{tmp_path}/cache.db")
+    yield
+    configure_shared_backend(None)
+
+
+def test_workers_share_results_through_backend(shared_cache):
+    lookup = Mock(return_value={"teams": ["team"]})
+    # the same function cached by two workers
+    worker = ttl_cache("lookup", ttl=60, shared=True)(lookup)
+    other_worker = ttl_cache("lookup", ttl=60, shared=True)(lookup)
+
+    assert worker("user") == {"teams": ["team"]}
+    assert other_worker("user") == {"teams": ["team"]}
+    lookup.assert_called_once_with("user")
+    assert other_worker.cache.stats.shared_hits == 1
+
+
+def test_refresh_bypasses_and_updates_caches(shared_cache):
+    lookup = Mock(side_effect=[["old"], ["new"]])
+    worker = ttl_cache("lookup", ttl=60, shared=True)(lookup)
+    other_worker = ttl_cache("lookup", ttl=60, shared=True)(Mock())
+
+    assert worker("user") == ["old"]
+    assert worker.refresh("user") == ["new"]
+
+    assert worker("user") == ["new"]
+    assert other_worker("user") == ["new"]
+    assert lookup.call_count == 2
+
+
+def test_unavailable_backend_falls_back_to_loader(shared_cache):
+    lookup = Mock(return_value=["team"])
+    cached = ttl_cache("lookup", ttl=60, shared=True)(lookup)
+
+    with patch.object(SQLiteBackend, "get", side_effect=OSError):
+        assert cached("user") == ["team"]
+
+    assert cached.cache.stats.shared_errors == 1
+
+
+def test_backend_entries_expire(tmp_path):
+    backend = SQLiteBackend(f"{tmp_path}/cache.db")
+    backend.set("fresh", [1], ttl=60)
+    backend.set("expired", [2], ttl=-1)
+
+    assert backend.get("fresh").value == [1]
+    assert backend.get("fresh").ttl <= 60
+    assert backend.get("expired") is None
+
+
+def test_backend_from_url():
+    assert cache_backend(None) is None
+    assert isinstance(cache_backend("redis://localhost:6379/0"), RedisBackend)
+    with pytest.raises(ValueError):
+        cache_backend("memcached://localhost")
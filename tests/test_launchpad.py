@@ -0,0 +1,42 @@
+from unittest.mock import Mock, patch
+
+from app.public.launchpad import (
+    LAUNCHPAD_POOL_SIZE,
+    LAUNCHPAD_TIMEOUT,
+    LAUNCHPAD_URL,
+    get_launchpad_team,
+    get_user_teams,
+    launchpad_session,
+)
+
+
+def test_session_pools_and_retries_gets():
+    adapter = launchpad_session.get_adapter(LAUNCHPAD_URL)
+    retry = adapter.max_retries
+
+    assert adapter._pool_maxsize == LAUNCHPAD_POOL_SIZE
+    assert retry.allowed_methods == frozenset({"GET"})
+    assert retry.read == 0
+    assert retry.backoff_jitter > 0
+    assert 503 in retry.status_forcelist
+
+
+@patch("app.public.launchpad.launchpad_session")
+def test_user_teams_use_session_with_split_timeouts(mock_session):
+    mock_session.get.return_value = Mock(
+        status_code=200, json=lambda: {"entries": [{"name": "team"}]}
+    )
+
+    assert get_user_teams("session-user") == ["team"]
+
+    _, kwargs = mock_session.get.call_args
+    connect_timeout, read_timeout = kwargs["timeout"]
+    assert kwargs["timeout"] == LAUNCHPAD_TIMEOUT
+    assert connect_timeout < read_timeout
+
+
+@patch("app.public.launchpad.launchpad_session")
+def test_missing_team_is_none(mock_session):
+    mock_session.get.return_value = Mock(status_code=404)
+
+    assert get_launchpad_team("missing-team") is None
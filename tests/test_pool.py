@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.pool import InstrumentedQueuePool, pool_status, prefill_pool
+from config import engine_options
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv("FLASK_DB_POOL_SIZE", "20")
+    monkeypatch.setenv("FLASK_DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("FLASK_DB_STATEMENT_TIMEOUT_MS", "5000")
+
+    options = engine_options("postgresql://user@db/solutions")
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 10
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {
+        "options": "-c statement_timeout=5000"
+    }
+
+
+def test_engine_options_of_sqlite_leave_pool_defaults():
+    assert engine_options("sqlite://") == {"pool_pre_ping": True}
+
+
+def test_pool_status_counts_checkouts_and_overflow(engine):
+    prefill_pool(engine, 2)
+    assert pool_status(engine)["checked_in"] == 2
+
+    connections = [engine.connect() for _ in range(3)]
+    status = pool_status(engine)
+
+    assert status["checked_out"] == 3
+    assert status["overflow"] == 1
+    assert status["checkouts"] == 5
+
+    for connection in connections:
+        connection.close()
+
+
+def test_pool_status_counts_timeouts(engine):
+    connections = [engine.connect() for _ in range(3)]
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = pool_status(engine)
+    assert status["timeouts"] == 1
+    assert status["wait_max_ms"] >= 10
+
+    for connection in connections:
+        connection.close()
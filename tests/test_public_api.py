@@ -1,7 +1,10 @@
 import pytest
+from datetime import datetime
 from unittest.mock import patch
 from flask import Flask
 from app.public.api import public_bp
+from app.public.catalog import catalog_snapshot, published_solution_changed
+from app.public.logic import DEFAULT_PAGE_SIZE, CatalogVersion
 
 
 @pytest.fixture
@@ -23,7 +26,33 @@ def client(app):
     return app.test_client()
 
 
-@patch("app.public.api.get_all_published_solutions")
+@pytest.fixture(autouse=True)
+def reset_catalog_snapshot():
+    catalog_snapshot.invalidate()
+    yield
+    catalog_snapshot.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def mock_catalog_version():
+    with patch("app.public.catalog.get_published_catalog_version") as mock:
+        mock.return_value = CatalogVersion(2, datetime(2026, 1, 1))
+        yield mock
+
+
+@pytest.fixture
+def database_search(app):
+    app.config["SEARCH_BACKEND"] = "database"
+
+
+@pytest.fixture
+def mock_solution_validators():
+    with patch("app.public.api.get_published_solution_validators") as mock:
+        mock.return_value = ("abc123", datetime(2026, 1, 1))
+        yield mock
+
+
+@patch("app.public.catalog.get_all_published_solutions")
 def test_list_all_published_solutions(
     mock_get_all_published_solutions, client
 ):
@@ -40,28 +69,212 @@ def test_list_all_published_solutions(
     mock_get_all_published_solutions.assert_called_once()
 
 
+@patch("app.public.catalog.get_all_published_solutions")
+def test_list_published_solutions_serves_snapshot(
+    mock_get_all_published_solutions, client
+):
+    mock_get_all_published_solutions.return_value = [{"name": "solution1"}]
+    first = client.get("/api/solutions")
+    second = client.get("/api/solutions")
+
+    assert first.data == second.data
+    mock_get_all_published_solutions.assert_called_once()
+
+    published_solution_changed("solution1")
+    mock_get_all_published_solutions.return_value = [{"name": "solution2"}]
+    response = client.get("/api/solutions")
+
+    assert response.get_json() == [{"name": "solution2"}]
+    assert mock_get_all_published_solutions.call_count == 2
+
+
+@patch("app.public.catalog.get_all_published_solutions")
+def test_list_published_solutions_rebuilds_on_new_version(
+    mock_get_all_published_solutions, mock_catalog_version, client
+):
+    mock_get_all_published_solutions.return_value = [{"name": "solution1"}]
+    client.get("/api/solutions")
+
+    mock_catalog_version.return_value = CatalogVersion(
+        3, datetime(2026, 1, 2)
+    )
+    client.get("/api/solutions")
+
+    assert mock_get_all_published_solutions.call_count == 2
+
+
+@patch("app.public.catalog.get_all_published_solutions")
+def test_list_published_solutions_conditional_get(
+    mock_get_all_published_solutions, client
+):
+    mock_get_all_published_solutions.return_value = [{"name": "solution1"}]
+    response = client.get("/api/solutions")
+
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"] == (
+        "Thu, 01 Jan 2026 00:00:00 GMT"
+    )
+
+    catalog_snapshot.invalidate()
+    not_modified = client.get(
+        "/api/solutions",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == response.headers["ETag"]
+    mock_get_all_published_solutions.assert_called_once()
+
+
+@patch("app.public.catalog.get_all_published_solutions")
+def test_list_published_solutions_if_modified_since(
+    mock_get_all_published_solutions, client
+):
+    mock_get_all_published_solutions.return_value = [{"name": "solution1"}]
+
+    not_modified = client.get(
+        "/api/solutions",
+        headers={"If-Modified-Since": "Thu, 01 Jan 2026 00:00:00 GMT"},
+    )
+    modified = client.get(
+        "/api/solutions",
+        headers={"If-Modified-Since": "Wed, 31 Dec 2025 00:00:00 GMT"},
+    )
+
+    assert not_modified.status_code == 304
+    assert modified.status_code == 200
+
+
+@patch("app.public.api.get_published_solutions_page")
+def test_list_published_solutions_page(mock_get_page, client):
+    mock_get_page.return_value = {
+        "solutions": [{"name": "solution1"}],
+        "next": "cursor",
+    }
+    response = client.get("/api/solutions?limit=1&after=start")
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "solutions": [{"name": "solution1"}],
+        "next": "cursor",
+        "total": 2,
+    }
+    mock_get_page.assert_called_once_with(1, "start", fields=None)
+
+
+@patch("app.public.api.get_all_published_solutions")
+def test_list_published_solutions_with_fields(mock_get_all, client):
+    mock_get_all.return_value = [{"name": "solution1"}]
+
+    response = client.get("/api/solutions?fields=name, title,name")
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"name": "solution1"}]
+    mock_get_all.assert_called_once_with(("name", "title"))
+
+
+@pytest.mark.parametrize("fields", ["bogus", "name,creator", ","])
+def test_list_published_solutions_invalid_fields(fields, client):
+    response = client.get(f"/api/solutions?fields={fields}")
+
+    assert response.status_code == 400
+    assert response.get_json()["error-list"][0]["code"] == "invalid-fields"
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "abc", "1000", "²"])
+def test_list_published_solutions_invalid_limit(limit, client):
+    response = client.get(f"/api/solutions?limit={limit}")
+
+    assert response.status_code == 400
+    assert response.get_json()["error-list"][0]["code"] == "invalid-limit"
+
+
+@pytest.mark.usefixtures("database_search")
+@patch("app.public.api.catalog_snapshot.count")
+@patch("app.public.api.get_published_solutions_page")
+def test_search_solutions_page(mock_get_page, mock_count, client):
+    mock_get_page.return_value = {"solutions": [], "next": None}
+    mock_count.return_value = 7
+
+    response = client.get("/api/solutions/search?q=test&limit=5")
+
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 7
+    mock_get_page.assert_called_once_with(
+        5, None, query="test", filters={}
+    )
+    mock_count.assert_called_once_with("test")
+
+
 @patch("app.public.api.get_published_solution_by_name")
-def test_get_solution_by_name(mock_get_published_solution_by_name, client):
+def test_get_solution_by_name(
+    mock_get_published_solution_by_name, mock_solution_validators, client
+):
     mock_get_published_solution_by_name.return_value = {"name": "solution1"}
     response = client.get("/api/solutions/solution1")
     assert response.status_code == 200
     data = response.get_json()
     assert data["name"] == "solution1"
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"]
     mock_get_published_solution_by_name.assert_called_once_with("solution1")
 
 
 @patch("app.public.api.get_published_solution_by_name")
-def test_get_solution_not_found(mock_get_published_solution_by_name, client):
-    mock_get_published_solution_by_name.return_value = None
+def test_get_solution_not_modified(
+    mock_get_published_solution_by_name, mock_solution_validators, client
+):
+    mock_get_published_solution_by_name.return_value = {"name": "solution1"}
+    etag = client.get("/api/solutions/solution1").headers["ETag"]
+
+    response = client.get(
+        "/api/solutions/solution1", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    mock_get_published_solution_by_name.assert_called_once()
+
+    mock_solution_validators.return_value = ("def456", datetime(2026, 1, 2))
+    response = client.get(
+        "/api/solutions/solution1", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@patch("app.public.api.get_published_solution_by_name")
+def test_get_solution_not_found(
+    mock_get_published_solution_by_name, mock_solution_validators, client
+):
+    mock_solution_validators.return_value = None
     response = client.get("/api/solutions/non-existent-solution")
     assert response.status_code == 404
     data = response.get_json()
     assert data["error"] == "Solution not found"
-    mock_get_published_solution_by_name.assert_called_once_with(
-        "non-existent-solution"
+    mock_solution_validators.assert_called_once_with("non-existent-solution")
+    mock_get_published_solution_by_name.assert_not_called()
+
+
+@patch("app.public.api.get_published_solution_by_hash")
+@patch("app.public.api.get_preview_solution_validators")
+def test_get_solution_preview_not_modified(
+    mock_validators, mock_get_published_solution_by_hash, client
+):
+    mock_validators.return_value = ("abc123", datetime(2026, 1, 1))
+    mock_get_published_solution_by_hash.return_value = {"name": "solution1"}
+    etag = client.get("/api/solutions/preview/abc123").headers["ETag"]
+
+    response = client.get(
+        "/api/solutions/preview/abc123", headers={"If-None-Match": etag}
     )
 
+    assert response.status_code == 304
+    mock_get_published_solution_by_hash.assert_called_once_with("abc123")
 
+
+@pytest.mark.usefixtures("database_search")
 @patch("app.public.api.search_published_solutions")
 def test_search_solutions(mock_search_published_solutions, client):
     mock_search_published_solutions.return_value = [{"name": "solution1"}]
@@ -73,6 +286,7 @@ def test_search_solutions(mock_search_published_solutions, client):
     mock_search_published_solutions.assert_called_once_with("test")
 
 
+@pytest.mark.usefixtures("database_search")
 @patch("app.public.api.search_published_solutions")
 def test_search_solutions_no_query(mock_search_published_solutions, client):
     mock_search_published_solutions.return_value = []
@@ -83,6 +297,7 @@ def test_search_solutions_no_query(mock_search_published_solutions, client):
     mock_search_published_solutions.assert_called_once_with("")
 
 
+@pytest.mark.usefixtures("database_search")
 @patch("app.public.api.search_published_solutions")
 def test_search_solutions_no_results(mock_search_published_solutions, client):
     mock_search_published_solutions.return_value = []
@@ -95,6 +310,183 @@ def test_search_solutions_no_results(mock_search_published_solutions, client):
     )
 
 
+@patch("app.public.api.search_index")
+def test_search_solutions_in_memory(mock_search_index, client):
+    mock_search_index.search.return_value = [{"name": "solution1"}]
+
+    response = client.get("/api/solutions/search?q=test")
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"name": "solution1"}]
+    mock_search_index.search.assert_called_once_with(
+        "test", CatalogVersion(2, datetime(2026, 1, 1))
+    )
+
+
+@patch("app.public.api.search_index")
+def test_search_solutions_in_memory_page(mock_search_index, client):
+    mock_search_index.search_page.return_value = {
+        "solutions": [],
+        "next": None,
+        "total": 0,
+    }
+
+    response = client.get("/api/solutions/search?q=test&limit=5&after=c")
+
+    assert response.status_code == 200
+    mock_search_index.search_page.assert_called_once_with(
+        "test",
+        CatalogVersion(2, datetime(2026, 1, 1)),
+        5,
+        "c",
+        filters={},
+        facets=None,
+    )
+
+
+def test_list_published_solutions_rejects_unknown_facets(client):
+    response = client.get("/api/solutions?publisher=x&facets=color")
+
+    assert response.status_code == 400
+    assert response.get_json()["error-list"][0]["code"] == "invalid-facets"
+
+
+@patch("app.public.api.search_index")
+def test_search_solutions_with_filters(mock_search_index, client):
+    mock_search_index.search_page.return_value = {
+        "solutions": [],
+        "next": None,
+        "total": 0,
+        "facets": {},
+    }
+
+    response = client.get(
+        "/api/solutions/search?q=test&platform=kubernetes&charm=a&charm=b"
+        "&facets=platform,publisher"
+    )
+
+    assert response.status_code == 200
+    mock_search_index.search_page.assert_called_once_with(
+        "test",
+        CatalogVersion(2, datetime(2026, 1, 1)),
+        DEFAULT_PAGE_SIZE,
+        None,
+        filters={"platform": ["kubernetes"], "charm": ["a", "b"]},
+        facets=["platform", "publisher"],
+    )
+
+
+@pytest.mark.usefixtures("database_search")
+@patch("app.public.api.count_published_solutions")
+@patch("app.public.api.get_published_solutions_page")
+def test_search_solutions_with_filters_in_database(
+    mock_get_page, mock_count, client
+):
+    mock_get_page.return_value = {"solutions": [], "next": None}
+    mock_count.return_value = 0
+
+    response = client.get("/api/solutions/search?q=test&juju_versions=3.6")
+
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 0
+    mock_get_page.assert_called_once_with(
+        DEFAULT_PAGE_SIZE,
+        None,
+        query="test",
+        filters={"juju_versions": ["3.6"]},
+    )
+    mock_count.assert_called_once_with("test", {"juju_versions": ["3.6"]})
+
+
+@patch("app.public.api.search_index")
+def test_list_published_solutions_with_filters(mock_search_index, client):
+    mock_search_index.search_page.return_value = {
+        "solutions": [{"name": "solution1", "title": "Solution 1"}],
+        "next": None,
+        "total": 1,
+        "facets": {"publisher": {"publisher": 1}},
+    }
+
+    response = client.get(
+        "/api/solutions?publisher=publisher&limit=5&fields=name"
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "solutions": [{"name": "solution1"}],
+        "next": None,
+        "total": 1,
+        "facets": {"publisher": {"publisher": 1}},
+    }
+    assert response.headers["ETag"]
+    mock_search_index.search_page.assert_called_once_with(
+        None,
+        CatalogVersion(2, datetime(2026, 1, 1)),
+        5,
+        None,
+        filters={"publisher": ["publisher"]},
+        facets=None,
+    )
+
+
+@patch("app.public.api.search_index")
+def test_suggest_solutions(mock_search_index, client):
+    mock_search_index.suggest.return_value = [
+        {"name": "solution1", "title": "Solution 1"}
+    ]
+
+    response = client.get("/api/solutions/suggest?q=sol&limit=5")
+
+    assert response.status_code == 200
+    assert response.get_json() == [
+        {"name": "solution1", "title": "Solution 1"}
+    ]
+    mock_search_index.suggest.assert_called_once_with(
+        "sol", CatalogVersion(2, datetime(2026, 1, 1)), 5
+    )
+
+
+@pytest.mark.parametrize("limit", ["0", "²"])
+def test_suggest_solutions_invalid_limit(limit, client):
+    response = client.get(f"/api/solutions/suggest?q=sol&limit={limit}")
+
+    assert response.status_code == 400
+    assert response.get_json()["error-list"][0]["code"] == "invalid-limit"
+
+
+@patch("app.public.api.search_index")
+def test_get_charm_solutions(mock_search_index, client):
+    mock_search_index.solutions_with_charm.return_value = [
+        {"name": "solution1", "title": "Solution 1"}
+    ]
+
+    response = client.get("/api/charms/charm-a/solutions?fields=name")
+
+    assert response.status_code == 200
+    assert response.get_json() == [{"name": "solution1"}]
+    mock_search_index.solutions_with_charm.assert_called_once_with(
+        "charm-a", CatalogVersion(2, datetime(2026, 1, 1))
+    )
+
+    response = client.get(
+        "/api/charms/charm-a/solutions?fields=name",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.usefixtures("database_search")
+@patch("app.public.api.get_published_solutions_by_charm")
+def test_get_charm_solutions_from_database(mock_get_by_charm, client):
+    mock_get_by_charm.return_value = []
+
+    response = client.get("/api/charms/charm-a/solutions")
+
+    assert response.status_code == 200
+    assert response.get_json() == []
+    mock_get_by_charm.assert_called_once_with("charm-a", None)
+
+
 @patch("app.public.api.Solution")
 def test_check_solution_name_exists(mock_solution, client):
     mock_solution.query.filter_by.return_value.first.return_value = {
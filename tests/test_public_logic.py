@@ -0,0 +1,324 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import (
+    Maintainer,
+    Publisher,
+    Solution,
+    SolutionStatus,
+    Visibility,
+)
+from app.exceptions import ValidationError
+from app.public.logic import (
+    count_published_solutions,
+    get_all_published_solutions,
+    get_published_solutions_by_charm,
+    get_published_solutions_page,
+    get_preview_solution_validators,
+    get_published_catalog_version,
+    get_published_solution_validators,
+    search_published_solutions,
+)
+from app.public.catalog import catalog_snapshot
+from app.publisher.logic import get_solutions_by_lp_teams
+from app.reviewer.logic import approve_solution_metadata
+from conftest import make_solution
+
+
+@pytest.fixture
+def published_solutions(db_app):
+    for index in range(5):
+        make_solution(f"solution-{index}")
+    make_solution("draft-solution", status=SolutionStatus.DRAFT)
+    make_solution("private-solution", visibility=Visibility.PRIVATE)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def record_queries(fn):
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    return result, statements
+
+
+def test_list_published_solutions_does_not_lazy_load(
+    published_solutions, lazy_load_guard
+):
+    solutions = get_all_published_solutions()
+
+    assert sorted(s["name"] for s in solutions) == [
+        f"solution-{index}" for index in range(5)
+    ]
+    assert solutions[0]["charms"]
+    assert solutions[0]["maintainers"]
+
+
+def test_search_published_solutions_does_not_lazy_load(
+    published_solutions, lazy_load_guard
+):
+    assert len(search_published_solutions("Summary")) == 5
+
+
+def test_publisher_solutions_do_not_lazy_load(
+    published_solutions, lazy_load_guard
+):
+    solutions = get_solutions_by_lp_teams(["publisher"])
+
+    assert len(solutions) == 7
+    assert all(s["creator"] for s in solutions)
+
+
+def test_list_query_count_is_independent_of_catalog_size(
+    published_solutions,
+):
+    _, small = record_queries(get_all_published_solutions)
+
+    for index in range(5, 20):
+        make_solution(f"solution-{index}")
+    db.session.commit()
+    db.session.expunge_all()
+
+    solutions, large = record_queries(get_all_published_solutions)
+
+    assert len(solutions) == 20
+    assert len(small) == len(large)
+
+
+def test_catalog_snapshot_is_rebuilt_after_publishing(published_solutions):
+    catalog_snapshot.invalidate()
+    make_solution(
+        "pending-solution", status=SolutionStatus.PENDING_METADATA_REVIEW
+    )
+    db.session.commit()
+
+    _, body = catalog_snapshot.get()
+    before = json.loads(body)
+    approve_solution_metadata("pending-solution", "reviewer@example.com")
+    _, body = catalog_snapshot.get()
+    after = json.loads(body)
+
+    assert "pending-solution" not in [s["name"] for s in before]
+    assert "pending-solution" in [s["name"] for s in after]
+
+
+def test_catalog_version_changes_after_publishing(published_solutions):
+    make_solution(
+        "pending-solution", status=SolutionStatus.PENDING_METADATA_REVIEW
+    )
+    db.session.commit()
+    before = get_published_catalog_version()
+
+    approve_solution_metadata("pending-solution", "reviewer@example.com")
+
+    assert before.count == 5
+    assert get_published_catalog_version() != before
+
+
+def test_catalog_version_changes_after_related_edits(published_solutions):
+    before = get_published_catalog_version()
+
+    db.session.get(Publisher, "publisher-id").display_name = "Renamed"
+    db.session.query(Maintainer).update({"display_name": "Maintainer 2"})
+    db.session.commit()
+    after = get_published_catalog_version()
+
+    assert after[:2] == before[:2]
+    # one increment per transaction
+    assert after.serial == before.serial + 1
+
+
+def test_catalog_version_ignores_unpublished_edits(published_solutions):
+    before = get_published_catalog_version()
+
+    draft = db.session.query(Solution).filter_by(name="draft-solution").one()
+    draft.summary = "Autosaved"
+    draft.creator.mattermost_handle = "creator"
+    db.session.commit()
+    private = (
+        db.session.query(Solution).filter_by(name="private-solution").one()
+    )
+    private.title = "Private"
+    db.session.add(Maintainer(display_name="New", email="new@example.com"))
+    db.session.commit()
+    draft.status = SolutionStatus.PENDING_NAME_REVIEW
+    db.session.commit()
+
+    assert get_published_catalog_version() == before
+
+
+def test_preview_validators_of_unpublished_revision(db_app):
+    old = make_solution("solution", status=SolutionStatus.UNPUBLISHED)
+    new = make_solution("solution", revision=2)
+    db.session.commit()
+
+    assert get_preview_solution_validators(old.hash)[:2] == (
+        new.hash,
+        new.last_updated,
+    )
+    assert get_preview_solution_validators("missing") is None
+
+
+def test_solution_validators_change_after_related_edits(published_solutions):
+    before = get_published_solution_validators("solution-0")
+
+    db.session.get(Publisher, "publisher-id").display_name = "Renamed"
+    db.session.commit()
+    renamed = get_published_solution_validators("solution-0")
+    db.session.query(Maintainer).update({"display_name": "Maintainer 2"})
+    db.session.commit()
+    after = get_published_solution_validators("solution-0")
+
+    assert before[:2] == renamed[:2] == after[:2]
+    assert len({before, renamed, after}) == 3
+
+
+def test_published_solutions_page_walks_catalog_with_cursor(
+    published_solutions,
+):
+    names = []
+    page = get_published_solutions_page(2)
+    while True:
+        names += [s["name"] for s in page["solutions"]]
+        if not page["next"]:
+            break
+        page = get_published_solutions_page(2, after=page["next"])
+
+    assert names == [f"solution-{index}" for index in range(5)]
+    assert count_published_solutions() == 5
+
+
+def test_published_solutions_page_with_search_query(published_solutions):
+    make_solution("searchable", summary="A needle in the catalog")
+    db.session.commit()
+
+    page = get_published_solutions_page(10, query="needle")
+
+    assert [s["name"] for s in page["solutions"]] == ["searchable"]
+    assert page["next"] is None
+    assert count_published_solutions("needle") == 1
+
+
+def test_published_solutions_page_rejects_invalid_cursor(
+    published_solutions,
+):
+    with pytest.raises(ValidationError) as exc_info:
+        get_published_solutions_page(2, after="not-a-cursor")
+
+    assert exc_info.value.errors[0]["code"] == "invalid-cursor"
+
+
+def test_card_fieldset_does_not_load_child_collections(
+    published_solutions, lazy_load_guard
+):
+    fields = ("name", "title", "summary", "media", "publisher")
+    solutions, statements = record_queries(
+        lambda: get_all_published_solutions(fields)
+    )
+
+    assert len(solutions) == 5
+    assert list(solutions[0]) == list(fields)
+    assert solutions[0]["publisher"]["username"] == "publisher"
+    assert len(statements) == 1
+    assert "description" not in statements[0]
+
+
+def test_search_ranks_title_matches_first(db_app):
+    make_solution("in-description", description="Observability for all")
+    make_solution("in-summary", summary="An observability stack")
+    make_solution("in-title", title="Observability")
+    make_solution(
+        "unpublished",
+        title="Observability",
+        status=SolutionStatus.UNPUBLISHED,
+    )
+    db.session.commit()
+
+    results = search_published_solutions("observ")
+
+    assert [s["name"] for s in results] == [
+        "in-title",
+        "in-summary",
+        "in-description",
+    ]
+
+
+def test_search_index_follows_publishing(published_solutions):
+    make_solution(
+        "pending-solution",
+        title="Kubeflow",
+        status=SolutionStatus.PENDING_METADATA_REVIEW,
+    )
+    db.session.commit()
+    assert search_published_solutions("kubeflow") == []
+
+    approve_solution_metadata("pending-solution", "reviewer@example.com")
+
+    assert [s["name"] for s in search_published_solutions("kubeflow")] == [
+        "pending-solution"
+    ]
+
+
+def test_search_pages_follow_relevance_order(db_app):
+    for index in range(3):
+        make_solution(f"title-{index}", title=f"Needle {index}")
+        make_solution(f"summary-{index}", summary="A needle")
+    db.session.commit()
+
+    names = []
+    page = get_published_solutions_page(2, query="needle")
+    while True:
+        names += [s["name"] for s in page["solutions"]]
+        if not page["next"]:
+            break
+        page = get_published_solutions_page(
+            2, after=page["next"], query="needle"
+        )
+
+    assert names == [s["name"] for s in search_published_solutions("needle")]
+    assert len(names) == 6
+    assert count_published_solutions("needle") == 6
+
+
+def test_published_solutions_by_charm(published_solutions):
+    make_solution("other-charms", charms=("charm-c",))
+    db.session.commit()
+
+    solutions = get_published_solutions_by_charm("charm-a", ("name",))
+
+    assert solutions == [{"name": f"solution-{index}"} for index in range(5)]
+    solutions = get_published_solutions_by_charm("charm-c")
+    assert [s["name"] for s in solutions] == ["other-charms"]
+
+
+def test_published_solutions_page_with_facet_filters(published_solutions):
+    make_solution(
+        "juju-2",
+        juju_versions=["2.9"],
+        platform_version=["1.28", "1.29"],
+    )
+    make_solution("juju-3", juju_versions=["3.5", "3.6"])
+    db.session.commit()
+
+    def names(filters):
+        page = get_published_solutions_page(10, filters=filters)
+        return [s["name"] for s in page["solutions"]]
+
+    assert names({"juju_versions": ["3.6"]}) == ["juju-3"]
+    assert names({"juju_versions": ["2.9", "3.5"]}) == ["juju-2", "juju-3"]
+    assert names({"platform_version": ["1.29"], "charm": ["charm-a"]}) == [
+        "juju-2"
+    ]
+    assert names({"platform": ["machine"]}) == []
+    assert names({"publisher": ["missing"]}) == []
+    assert count_published_solutions(filters={"juju_versions": ["3"]}) == 0
@@ -52,7 +52,38 @@ def test_get_publisher_solutions(
     data = response.get_json()
     assert len(data) == 2
     assert data[0]["name"] == "solution1"
-    mock_get_solutions_by_lp_teams.assert_called_once_with(["team1", "team2"])
+    mock_get_solutions_by_lp_teams.assert_called_once_with(
+        ["team1", "team2"], fields=None
+    )
+
+
+@patch("app.public.auth.get_user_teams")
+@patch("app.public.auth.decode_jwt_token")
+@patch("app.publisher.api.get_solutions_by_lp_teams")
+def test_get_publisher_solutions_with_fields(
+    mock_get_solutions_by_lp_teams, mock_decode_jwt_token, mock_get_user_teams, client
+):
+    mock_decode_jwt_token.return_value = {"sub": "testuser"}
+    mock_get_user_teams.return_value = ["team1"]
+    mock_get_solutions_by_lp_teams.return_value = [{"name": "solution1"}]
+
+    response = client.get(
+        "/api/publisher/solutions?fields=name,status,creator",
+        headers={"Authorization": "Bearer fake token"},
+    )
+
+    assert response.status_code == 200
+    mock_get_solutions_by_lp_teams.assert_called_once_with(
+        ["team1"], fields=("name", "status", "creator")
+    )
+
+    response = client.get(
+        "/api/publisher/solutions?fields=name,bogus",
+        headers={"Authorization": "Bearer fake token"},
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["error-list"][0]["code"] == "invalid-fields"
 
 
 @patch("app.public.auth.get_user_teams")
@@ -147,6 +178,41 @@ def test_register_solution_duplicate_name(
     assert data["error-list"][0]["code"] == "already-registered"
 
 
+@patch("app.public.auth.get_user_teams")
+@patch("app.public.auth.decode_jwt_token")
+@patch("app.publisher.api.get_archived_revision")
+@patch("app.publisher.api.get_solution_by_name_and_rev")
+def test_get_archived_solution_revision_hides_review_actions(
+    mock_get_solution_by_name_and_rev,
+    mock_get_archived_revision,
+    mock_decode_jwt_token,
+    mock_get_user_teams,
+    client,
+):
+    mock_decode_jwt_token.return_value = {
+        "sub": "testuser",
+    }
+    mock_get_user_teams.return_value = ["team1"]
+    mock_get_solution_by_name_and_rev.return_value = None
+    mock_get_archived_revision.return_value = {
+        "name": "test-solution",
+        "revision": 1,
+        "publisher": {"username": "team1"},
+        "review_actions": [{"reviewer_id": "reviewer@example.com"}],
+    }
+
+    response = client.get(
+        "/api/publisher/solutions/test-solution/1",
+        headers={"Authorization": "Bearer fake token"},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["revision"] == 1
+    assert "review_actions" not in data
+    mock_get_archived_revision.assert_called_once_with("test-solution", 1)
+
+
 @patch("app.public.auth.get_user_teams")
 @patch("app.public.auth.decode_jwt_token")
 @patch("app.publisher.api.update_solution_metadata")
@@ -1,13 +1,29 @@
 import pytest
 from unittest.mock import Mock, patch
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
 from app.publisher.logic import (
     find_or_create_creator,
     register_solution_package,
     create_empty_solution,
+    create_new_solution_revision,
+    update_draft_solution,
+    update_published_solution,
     validate_solution_metadata,
 )
-from app.models import Creator
+from app.public.logic import get_published_solution_by_name
+from app.child_sets import maintainer_set_id, use_case_set_id
+from app.models import (
+    Charm,
+    ChildSet,
+    Creator,
+    Maintainer,
+    Solution,
+    SolutionStatus,
+)
 from app.exceptions import ValidationError
+from conftest import make_solution
 
 
 class TestFindOrCreateCreator:
@@ -218,3 +234,201 @@ class TestTransactionSafety:
             )
 
         mock_session.rollback.assert_called_once()
+
+
+class TestLiveRevisions:
+    def test_publishing_draft_unpublishes_previous_revision(self, db_app):
+        previous = make_solution("solution")
+        draft = make_solution(
+            "solution", revision=2, status=SolutionStatus.DRAFT
+        )
+        db.session.commit()
+
+        update_draft_solution(draft, {"summary": "New summary"})
+
+        assert previous.status == SolutionStatus.UNPUBLISHED
+        assert draft.status == SolutionStatus.PUBLISHED
+        assert get_published_solution_by_name("solution")["revision"] == 2
+
+    def test_one_published_revision_per_name(self, db_app):
+        make_solution("solution")
+        make_solution("solution", revision=2)
+
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+
+    def test_new_revision_rejects_second_draft(self, db_app):
+        make_solution("solution", status=SolutionStatus.DRAFT)
+        published = make_solution("solution", revision=2)
+        db.session.commit()
+
+        with pytest.raises(ValidationError) as exc_info:
+            create_new_solution_revision("solution", published.creator)
+
+        assert exc_info.value.errors[0]["code"] == "draft-exists"
+
+
+class TestChildSets:
+    def test_new_revision_shares_unchanged_collections(self, db_app):
+        published = make_solution("solution")
+        db.session.commit()
+        sets_before = db.session.query(ChildSet).count()
+
+        update_published_solution(published, {"summary": "New summary"})
+
+        revision = db.session.query(Solution).filter_by(revision=2).one()
+        assert revision.charm_set_id == published.charm_set_id
+        assert revision.maintainer_set_id == published.maintainer_set_id
+        assert db.session.query(ChildSet).count() == sets_before
+        assert db.session.query(Charm).count() == 2
+
+    def test_changed_collection_gets_its_own_set(self, db_app):
+        published = make_solution("solution")
+        db.session.commit()
+
+        data = update_published_solution(
+            published, {"charms": ["charm-a", "charm-c"]}
+        )
+
+        revision = db.session.query(Solution).filter_by(revision=2).one()
+        assert revision.charm_set_id != published.charm_set_id
+        assert revision.use_case_set_id == published.use_case_set_id
+        assert [c["charm_name"] for c in data["charms"]] == [
+            "charm-a",
+            "charm-c",
+        ]
+        assert [c.charm_name for c in published.charms] == [
+            "charm-a",
+            "charm-b",
+        ]
+
+    def test_equal_collections_share_one_set(self, db_app):
+        first = make_solution("first", charms=("charm-a",))
+        second = make_solution("second", charms=(" charm-a", "charm-a"))
+        db.session.commit()
+
+        assert first.charm_set_id == second.charm_set_id
+
+    def test_duplicate_use_cases_share_the_deduplicated_set(self, db_app):
+        case = {"title": "Use case", "description": "Description"}
+
+        assert use_case_set_id([case]) == use_case_set_id(
+            [case, {"title": " Use case ", "description": "Description"}]
+        )
+
+    def test_maintainers_are_ordered_by_id(self, db_app):
+        maintainers = [
+            Maintainer(email=f"{name}@example.com", display_name=name)
+            for name in ("first", "second")
+        ]
+        db.session.add_all(maintainers)
+        db.session.flush()
+        solution = make_solution("solution")
+        solution.maintainer_set_id = maintainer_set_id(maintainers[::-1])
+        db.session.commit()
+        db.session.expire_all()
+
+        assert [m.email for m in solution.maintainers] == [
+            "first@example.com",
+            "second@example.com",
+        ]
+
+
+class TestDraftChildUpdates:
+    @patch("app.publisher.logic.get_user_details_by_email")
+    def test_unchanged_collections_are_not_written(
+        self, mock_user_details, db_app
+    ):
+        draft = make_solution("solution", status=SolutionStatus.DRAFT)
+        db.session.commit()
+        statements = []
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        update_draft_solution(
+            draft,
+            {
+                "charms": ["charm-a", "charm-b"],
+                "use_cases": [
+                    {"title": "Use case", "description": "Description"}
+                ],
+                "useful_links": [
+                    {"title": "Docs", "url": "https://example.com"}
+                ],
+                "maintainers": ["maintainer@example.com"],
+            },
+        )
+        event.remove(db.engine, "before_cursor_execute", record)
+
+        writes = [
+            s
+            for s in statements
+            if s.startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        assert all(
+            s.startswith(("UPDATE solution ", "UPDATE catalog_state "))
+            for s in writes
+        )
+        assert not any("child_set.digest" in s for s in statements)
+        mock_user_details.assert_not_called()
+
+    @patch("app.publisher.logic.get_user_details_by_email")
+    def test_only_added_maintainers_are_looked_up(
+        self, mock_user_details, db_app
+    ):
+        mock_user_details.return_value = {"display_name": "New"}
+        draft = make_solution("solution", status=SolutionStatus.DRAFT)
+        db.session.commit()
+
+        data = update_draft_solution(
+            draft,
+            {"maintainers": ["maintainer@example.com", "new@example.com"]},
+        )
+
+        mock_user_details.assert_called_once_with("new@example.com")
+        assert sorted(m["email"] for m in data["maintainers"]) == [
+            "maintainer@example.com",
+            "new@example.com",
+        ]
+
+
+class TestCloneRevision:
+    def test_new_revision_is_cloned_with_one_insert(self, db_app):
+        published = make_solution(
+            "solution", juju_versions=["3.4"], description="Description"
+        )
+        db.session.commit()
+        statements = []
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        draft = create_new_solution_revision("solution", published.creator)
+        event.remove(db.engine, "before_cursor_execute", record)
+
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        assert len(inserts) == 1
+        assert "SELECT" in inserts[0]
+        assert draft["revision"] == 2
+        assert draft["status"] == "draft"
+        assert draft["description"] == "Description"
+        assert draft["compatibility"]["juju_versions"] == ["3.4"]
+        assert draft["charms"] == get_published_solution_by_name(
+            "solution"
+        )["charms"]
+
+    def test_published_edit_overrides_editable_fields(self, db_app):
+        published = make_solution("solution", summary="Old summary")
+        db.session.commit()
+
+        data = update_published_solution(
+            published, {"summary": "New summary", "name": "ignored"}
+        )
+
+        assert data["summary"] == "New summary"
+        assert data["name"] == "solution"
+        assert data["revision"] == 2
+        assert published.status == SolutionStatus.UNPUBLISHED
@@ -0,0 +1,78 @@
+import pytest
+from flask import Flask
+
+from app.extensions import db
+from app.models import Publisher
+from app.replica import REPLICA_BIND, read_replica
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """
+    Create a Flask app with distinct SQLite databases as primary and
+    read replica, each holding one publisher named after it.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path}/primary.db"
+    app.config["SQLALCHEMY_BINDS"] = {
+        REPLICA_BIND: f"sqlite:///{tmp_path}/replica.db"
+    }
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(
+                    Publisher.__table__.insert(),
+                    {
+                        "publisher_id": "id",
+                        "username": engine.url.database.split("/")[-1],
+                        "display_name": "Publisher",
+                    },
+                )
+        db.session.remove()
+
+    @app.route("/read")
+    @read_replica
+    def read():
+        return db.session.query(Publisher.username).scalar()
+
+    @app.route("/write-then-read")
+    @read_replica
+    def write_then_read():
+        db.session.add(
+            Publisher(publisher_id="new", username="new", display_name="New")
+        )
+        db.session.flush()
+        return str(db.session.query(Publisher).count())
+
+    @app.route("/primary")
+    def primary():
+        return db.session.query(Publisher.username).scalar()
+
+    yield app
+    # init_app registered a metadata for the bind on the shared extension
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+def test_read_replica_routes_read_from_replica(replica_app):
+    client = replica_app.test_client()
+
+    assert client.get("/read").text == "replica.db"
+    assert client.get("/primary").text == "primary.db"
+
+
+def test_writes_and_reads_after_them_use_primary(replica_app):
+    client = replica_app.test_client()
+
+    assert client.get("/write-then-read").text == "2"
+
+
+def test_without_replica_reads_from_primary(db_app):
+    @db_app.route("/read")
+    @read_replica
+    def read():
+        return str(db.session.query(Publisher).count())
+
+    assert db_app.test_client().get("/read").text == "0"
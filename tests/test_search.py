@@ -0,0 +1,300 @@
+import pytest
+from unittest.mock import patch
+
+from app.exceptions import ValidationError
+from app.extensions import db
+from app.models import Publisher, Solution, SolutionStatus
+from app.public.catalog import catalog_snapshot, published_solution_changed
+from app.public.search import SearchIndex
+from app.reviewer.logic import approve_solution_metadata
+from conftest import make_solution
+
+VERSION = "version"
+
+
+def solution(
+    id,
+    name,
+    title="",
+    summary="",
+    description="",
+    charms=(),
+    platform="kubernetes",
+    publisher="canonical",
+):
+    return {
+        "id": id,
+        "name": name,
+        "title": title,
+        "summary": summary,
+        "description": description,
+        "use_cases": [],
+        "charms": [{"charm_name": charm} for charm in charms],
+        "publisher": {"username": publisher},
+        "deployable-on": [
+            {"platform": platform, "version": [], "prerequisites": []}
+        ],
+        "compatibility": {"juju_versions": ["3.6"]},
+    }
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.rebuild(
+        [
+            solution(1, "observability", title="Observability stack"),
+            solution(2, "kubeflow", summary="Observe machine learning"),
+            solution(3, "data", description="Observability of data"),
+            solution(
+                4,
+                "postgres",
+                charms=["postgresql-k8s"],
+                platform="machine",
+                publisher="data-team",
+            ),
+        ],
+        VERSION,
+    )
+    return index
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+def test_search_ranks_by_field_weight(index):
+    assert names(index.search("observability", VERSION)) == [
+        "observability",
+        "data",
+    ]
+
+
+def test_search_matches_prefixes(index):
+    assert set(names(index.search("obs", VERSION))) == {
+        "observability",
+        "kubeflow",
+        "data",
+    }
+
+
+def test_search_requires_every_term(index):
+    assert names(index.search("observ learning", VERSION)) == ["kubeflow"]
+    assert index.search("observ missing", VERSION) == []
+    assert index.search("", VERSION) == []
+
+
+def test_search_matches_charm_names(index):
+    assert names(index.search("postgresql-k8s", VERSION)) == ["postgres"]
+
+
+def test_search_page_walks_ranked_results(index):
+    expected = names(index.search("obs", VERSION))
+
+    page = index.search_page("obs", VERSION, 2)
+    results = page["solutions"]
+    assert page["total"] == 3
+
+    page = index.search_page("obs", VERSION, 2, page["next"])
+    results += page["solutions"]
+
+    assert names(results) == expected
+    assert page["next"] is None
+
+
+def test_search_page_rejects_invalid_cursor(index):
+    with pytest.raises(ValidationError):
+        index.search_page("obs", VERSION, 2, "invalid")
+
+
+def test_search_page_filters_by_facets(index):
+    page = index.search_page(
+        "obs", VERSION, 10, filters={"publisher": ["canonical"]}
+    )
+    assert set(names(page["solutions"])) == {
+        "observability",
+        "kubeflow",
+        "data",
+    }
+
+    page = index.search_page(
+        None, VERSION, 10, filters={"platform": ["machine", "missing"]}
+    )
+    assert names(page["solutions"]) == ["postgres"]
+    assert page["total"] == 1
+
+    page = index.search_page(
+        None,
+        VERSION,
+        10,
+        filters={"platform": ["machine"], "publisher": ["canonical"]},
+    )
+    assert page["solutions"] == []
+
+
+def test_search_page_counts_facets_without_their_own_filter(index):
+    page = index.search_page(
+        None,
+        VERSION,
+        10,
+        filters={"platform": ["kubernetes"], "charm": ["postgresql-k8s"]},
+    )
+
+    assert page["solutions"] == []
+    assert page["facets"]["platform"] == {"machine": 1}
+    assert page["facets"]["charm"] == {}
+    assert page["facets"]["juju_versions"] == {}
+
+    page = index.search_page(None, VERSION, 10, filters={"charm": []})
+    assert page["facets"]["platform"] == {"kubernetes": 3, "machine": 1}
+    assert page["facets"]["juju_versions"] == {"3.6": 4}
+
+
+def test_search_page_counts_requested_facets(index):
+    page = index.search_page(None, VERSION, 10, facets=["platform"])
+    assert page["facets"] == {"platform": {"kubernetes": 3, "machine": 1}}
+
+    page = index.search_page("postgres", VERSION, 10, facets=["charm"])
+    assert page["facets"]["charm"] == {"postgresql-k8s": 1}
+
+
+def test_search_page_caps_facet_values(index):
+    with patch("app.public.search.FACET_VALUES_LIMIT", 1):
+        page = index.search_page(None, VERSION, 10, facets=["platform"])
+
+    assert page["facets"] == {"platform": {"kubernetes": 3}}
+
+
+def test_search_page_lists_catalog_by_name(index):
+    page = index.search_page(None, VERSION, 3)
+    assert names(page["solutions"]) == ["data", "kubeflow", "observability"]
+
+    page = index.search_page(None, VERSION, 3, page["next"])
+    assert names(page["solutions"]) == ["postgres"]
+    assert page["next"] is None
+
+
+def test_suggest_matches_name_and_title_prefixes(index):
+    index.rebuild(
+        [
+            solution(1, "observability", title="Observability stack"),
+            solution(2, "cos-lite", title="Canonical Observability Lite"),
+            solution(3, "kubeflow", title="Kubeflow"),
+        ],
+        VERSION,
+    )
+
+    assert index.suggest("OBS", VERSION, 10) == [
+        {"name": "observability", "title": "Observability stack"},
+        {"name": "cos-lite", "title": "Canonical Observability Lite"},
+    ]
+    assert names(index.suggest("cos", VERSION, 10)) == ["cos-lite"]
+    assert names(index.suggest("observability  l", VERSION, 10)) == [
+        "cos-lite"
+    ]
+    assert len(index.suggest("o", VERSION, 1)) == 1
+    assert index.suggest(" ", VERSION, 10) == []
+
+
+def test_suggest_follows_removed_solutions(index):
+    index._remove("observability")
+
+    assert index.suggest("observability", VERSION, 10) == []
+
+
+def test_solutions_with_charm(index):
+    assert names(index.solutions_with_charm("postgresql-k8s", VERSION)) == [
+        "postgres"
+    ]
+    assert index.solutions_with_charm("missing", VERSION) == []
+
+
+def test_removed_solution_leaves_facets(index):
+    index._remove("postgres")
+
+    page = index.search_page(None, VERSION, 10)
+    assert page["facets"]["platform"] == {"kubernetes": 3}
+    assert "data-team" not in page["facets"]["publisher"]
+
+
+def test_search_rebuilds_on_new_version(index):
+    with patch(
+        "app.public.search.get_all_published_solutions"
+    ) as mock_get_all:
+        mock_get_all.return_value = [solution(5, "new", title="Observe")]
+
+        assert names(index.search("obs", "new-version")) == ["new"]
+        assert names(index.search("obs", "new-version")) == ["new"]
+        mock_get_all.assert_called_once()
+
+
+def test_publishing_refreshes_index_in_place(db_app):
+    make_solution("existing", title="Observability")
+    make_solution(
+        "pending",
+        title="Observability",
+        status=SolutionStatus.PENDING_METADATA_REVIEW,
+    )
+    db.session.commit()
+
+    index = SearchIndex()
+    with patch("app.public.catalog.search_index", index):
+        catalog_snapshot.invalidate()
+        assert names(index.search("obs", catalog_snapshot.version())) == [
+            "existing"
+        ]
+
+        with patch.object(index, "rebuild") as mock_rebuild:
+            approve_solution_metadata("pending", "reviewer@example.com")
+            results = index.search("obs", catalog_snapshot.version())
+
+        assert set(names(results)) == {"existing", "pending"}
+        mock_rebuild.assert_not_called()
+
+
+def test_refresh_keeps_index_stale_after_other_writes(db_app):
+    make_solution("alpha", title="Alpha", status=SolutionStatus.DRAFT)
+    db.session.commit()
+
+    index = SearchIndex()
+    with patch("app.public.catalog.search_index", index):
+        catalog_snapshot.invalidate()
+        assert names(index.search("alpha", catalog_snapshot.version())) == []
+
+        # committed by another writer, without refreshing this index
+        make_solution("zebra", title="Zebra")
+        db.session.commit()
+
+        draft = db.session.query(Solution).filter_by(name="alpha").one()
+        draft.status = SolutionStatus.PUBLISHED
+        db.session.commit()
+        index.refresh("alpha")
+        catalog_snapshot.invalidate()
+
+        assert names(index.search("zebra", catalog_snapshot.version())) == [
+            "zebra"
+        ]
+
+
+def test_refresh_keeps_index_stale_after_shared_edits(db_app):
+    make_solution("existing", title="Observability")
+    make_solution(
+        "pending",
+        title="Observability",
+        status=SolutionStatus.PENDING_METADATA_REVIEW,
+    )
+    db.session.commit()
+
+    index = SearchIndex()
+    with patch("app.public.catalog.search_index", index):
+        catalog_snapshot.invalidate()
+        index.search("obs", catalog_snapshot.version())
+
+        pending = db.session.query(Solution).filter_by(name="pending").one()
+        pending.status = SolutionStatus.PUBLISHED
+        db.session.get(Publisher, "publisher-id").display_name = "Renamed"
+        db.session.commit()
+        published_solution_changed("pending")
+        results = index.search("obs", catalog_snapshot.version())
+
+    assert {r["publisher"]["display_name"] for r in results} == {"Renamed"}
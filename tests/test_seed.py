@@ -0,0 +1,48 @@
+from app.extensions import db
+from app.models import (
+    Charm,
+    ReviewAction,
+    Solution,
+    SolutionStatus,
+    Visibility,
+)
+from app.public.logic import get_published_solution_by_name
+from seed import DatasetGenerator
+
+
+def generate(random_seed):
+    DatasetGenerator(
+        publishers=3, solutions=40, random_seed=random_seed, batch_size=15
+    ).generate()
+    return [
+        hash for (hash,) in db.session.query(Solution.hash).order_by("id")
+    ]
+
+
+def test_generated_dataset_is_consistent(db_app):
+    generate(random_seed=1)
+
+    names = db.session.query(Solution.name).distinct().count()
+    published = (
+        db.session.query(Solution)
+        .filter(
+            Solution.status == SolutionStatus.PUBLISHED,
+            Solution.visibility == Visibility.PUBLIC,
+        )
+        .first()
+    )
+    assert names == 40
+    assert db.session.query(Charm).count() > 0
+    assert db.session.query(ReviewAction).count() > 0
+    assert get_published_solution_by_name(published.name)["charms"]
+
+
+def test_generated_dataset_depends_on_seed_only(db_app):
+    first = generate(random_seed=1)
+    db.drop_all()
+    db.create_all()
+
+    assert generate(random_seed=1) == first
+    db.drop_all()
+    db.create_all()
+    assert generate(random_seed=2) != first